@@ -1,9 +1,11 @@
 """Endpoints for communication with botx."""
 
 from http import HTTPStatus
+from typing import Any
 
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import ORJSONResponse
 from pybotx import (
     Bot,
     BotXMethodCallbackNotFoundError,
@@ -17,19 +19,38 @@ from pybotx import (
 from pybotx.constants import BOT_API_VERSION
 
 from app.api.dependencies.bot import bot_dependency
+from app.bot.admission import BotOverloadedError
 from app.logger import logger
 from app.settings import settings
 
 router = APIRouter()
 
+# Constant bodies are encoded once instead of on every request
+COMMAND_ACCEPTED_BODY = orjson.dumps(build_command_accepted_response())
+
+
+async def read_json(request: Request) -> Any:
+    """Parse request body. Raises `ValueError` if it isn't valid JSON."""
+    return orjson.loads(await request.body())
+
+
+def build_accepted_response() -> Response:
+    return Response(
+        COMMAND_ACCEPTED_BODY,
+        status_code=HTTPStatus.ACCEPTED,
+        media_type=ORJSONResponse.media_type,
+    )
+
 
 @router.post("/command")
-async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONResponse:
+async def command_handler(  # noqa: WPS212
+    request: Request, bot: Bot = bot_dependency
+) -> Response:
     """Receive commands from users. Max timeout - 5 seconds."""
 
     try:  # noqa: WPS225
         bot.async_execute_raw_bot_command(
-            await request.json(),
+            await read_json(request),
             request_headers=request.headers,
         )
     except ValueError:
@@ -40,7 +61,7 @@ async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONRe
         else:
             logger.warning(error_label)
 
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label),
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
@@ -48,7 +69,7 @@ async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONRe
         error_label = f"No credentials for bot {exc.bot_id}"
         logger.warning(error_label)
 
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label),
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
@@ -59,26 +80,32 @@ async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONRe
         )
         logger.warning(error_label)
 
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label),
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
     except UnverifiedRequestError as exc:
         logger.warning(f"UnverifiedRequestError: {exc.args[0]}")
-        return JSONResponse(
+        return ORJSONResponse(
             content=build_unverified_request_response(
                 status_message=exc.args[0],
             ),
             status_code=HTTPStatus.UNAUTHORIZED,
         )
+    except BotOverloadedError:
+        error_label = "Bot is overloaded"
+        logger.warning(error_label)
 
-    return JSONResponse(
-        build_command_accepted_response(), status_code=HTTPStatus.ACCEPTED
-    )
+        return ORJSONResponse(
+            build_bot_disabled_response(error_label),
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+
+    return build_accepted_response()
 
 
 @router.get("/status")
-async def status_handler(request: Request, bot: Bot = bot_dependency) -> JSONResponse:
+async def status_handler(request: Request, bot: Bot = bot_dependency) -> Response:
     """Show bot status and commands list."""
 
     try:
@@ -89,47 +116,44 @@ async def status_handler(request: Request, bot: Bot = bot_dependency) -> JSONRes
     except UnknownBotAccountError as exc:
         error_label = f"Unknown bot_id: {exc.bot_id}"
         logger.warning(exc)
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label),
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
     except ValueError:
         error_label = "Invalid params"
         logger.warning(error_label)
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label), status_code=HTTPStatus.BAD_REQUEST
         )
     except UnverifiedRequestError as exc:
         logger.warning(f"UnverifiedRequestError: {exc.args[0]}")
-        return JSONResponse(
+        return ORJSONResponse(
             content=build_unverified_request_response(
                 status_message=exc.args[0],
             ),
             status_code=HTTPStatus.UNAUTHORIZED,
         )
 
-    return JSONResponse(status)
+    return ORJSONResponse(status)
 
 
 @router.post("/notification/callback")
-async def callback_handler(request: Request, bot: Bot = bot_dependency) -> JSONResponse:
+async def callback_handler(request: Request, bot: Bot = bot_dependency) -> Response:
     """Process BotX methods callbacks."""
 
     try:
         await bot.set_raw_botx_method_result(
-            await request.json(),
+            await read_json(request),
             verify_request=False,
         )
     except BotXMethodCallbackNotFoundError as exc:
         error_label = f"Unexpected callback with sync_id: {exc.sync_id}"
         logger.warning(error_label)
 
-        return JSONResponse(
+        return ORJSONResponse(
             build_bot_disabled_response(error_label),
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
 
-    return JSONResponse(
-        build_command_accepted_response(),
-        status_code=HTTPStatus.ACCEPTED,
-    )
+    return build_accepted_response()
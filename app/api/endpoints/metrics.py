@@ -0,0 +1,71 @@
+"""Endpoint with internal metrics of bot services."""
+
+from dataclasses import asdict
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from pybotx import Bot
+
+from app.api.dependencies.bot import bot_dependency
+from app.bot.admission import AdmissionControlBot
+from app.bot.chat_ordering import ChatOrderedBot
+from app.caching.callback_redis_repo import CallbackRedisRepo
+from app.caching.redis_repo import RedisRepo
+from app.db.sqlalchemy import MeasuredQueuePool, engine, replica_router
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics(bot: Bot = bot_dependency) -> Dict[str, Any]:
+    """Show counters and gauges of bot services."""
+    callback_repo: CallbackRedisRepo = bot.state.callback_repo
+    redis_repo: RedisRepo = bot.state.redis_repo
+
+    metrics_data: Dict[str, Any] = {
+        "callbacks": {
+            **asdict(callback_repo.stats),
+            "local_hit_ratio": callback_repo.stats.local_hit_ratio,
+        },
+    }
+
+    if redis_repo.local_cache is not None:
+        metrics_data["local_cache"] = {
+            **asdict(redis_repo.local_cache.stats),
+            "hit_ratio": redis_repo.local_cache.stats.hit_ratio,
+        }
+
+    compression = redis_repo.serializer.compression
+    if compression is not None:
+        metrics_data["compression"] = {
+            **asdict(compression.stats),
+            "ratio": compression.stats.ratio,
+        }
+
+    if isinstance(bot, AdmissionControlBot):
+        metrics_data["commands"] = asdict(bot.admission_stats)
+    if isinstance(bot, ChatOrderedBot):
+        metrics_data["commands"]["active_chats"] = bot.active_chats
+
+    pool: MeasuredQueuePool = engine.pool  # type: ignore
+    metrics_data["db_pool"] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **asdict(pool.stats),
+        "avg_checkout_time": pool.stats.avg_checkout_time,
+    }
+
+    if replica_router.engines:
+        metrics_data["db_replicas"] = [
+            {
+                "healthy": is_healthy,
+                "checked_out": replica_engine.pool.checkedout(),  # type: ignore
+            }
+            for replica_engine, is_healthy in zip(
+                replica_router.engines, replica_router.healthy
+            )
+        ]
+
+    return metrics_data
@@ -4,8 +4,10 @@ from fastapi import APIRouter
 
 from app.api.endpoints.botx import router as bot_router
 from app.api.endpoints.healthcheck import router as healthcheck_router
+from app.api.endpoints.metrics import router as metrics_router
 
 router = APIRouter()
 
 router.include_router(healthcheck_router)
+router.include_router(metrics_router)
 router.include_router(bot_router)
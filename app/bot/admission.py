@@ -0,0 +1,140 @@
+"""Limit of commands executed by bot at once."""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Deque, Optional
+
+from pybotx import Bot
+from pybotx.models.commands import BotCommand
+
+
+class BotOverloadedError(Exception):
+    """Command is rejected, because too many commands are executed and queued."""
+
+
+@dataclass
+class AdmissionStats:
+    in_flight: int = 0
+    queued: int = 0
+    # Admitted commands that can't queue for slots yet
+    waiting: int = 0
+    rejected: int = 0
+
+
+class AdmissionControlBot(Bot):
+    """Bot that executes up to `max_in_flight` commands at once.
+
+    Up to `max_queued` commands wait for their turn in order of arrival, others
+    are rejected with `BotOverloadedError`. Commands aren't limited, if
+    `max_in_flight` is 0. Commands that can't start at once for other reasons
+    are counted as waiting, aren't limited by `max_queued` and queue for slots
+    only when they can start.
+    """
+
+    def __init__(
+        self, *args: Any, max_in_flight: int = 0, max_queued: int = 0, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._max_in_flight = max_in_flight
+        self._max_queued = max_queued
+        # Slots of queued commands, they are set when slots are passed to them
+        self._queued_slots: Deque[asyncio.Event] = deque()
+
+        self.admission_stats = AdmissionStats()
+
+    def async_execute_bot_command(
+        self, bot_command: BotCommand
+    ) -> "asyncio.Task[None]":
+        # raise UnknownBotAccountError if no bot account with this bot_id.
+        self._bot_accounts_storage.ensure_bot_id_exists(bot_command.bot.id)
+
+        slot = None
+        if self._max_in_flight:
+            slot = self._take_slot(self._can_start(bot_command))
+
+        task = asyncio.create_task(self._execute_admitted(bot_command, slot))
+        self._handler_collector._tasks.add(task)  # noqa: WPS437
+        if slot is not None:
+            # Slot is released by callback, so task cancelled before its start
+            # doesn't leak it
+            task.add_done_callback(partial(self._release_admission, slot))
+
+        return task
+
+    async def _execute_bot_command(self, bot_command: BotCommand) -> None:
+        await self._handler_collector.handle_bot_command(bot_command, self)
+
+    def _can_start(self, bot_command: BotCommand) -> bool:
+        return True
+
+    def _take_slot(self, can_start: bool) -> asyncio.Event:
+        # Slots are taken synchronously, so commands received in one iteration
+        # of event loop can't exceed the limits
+        stats = self.admission_stats
+        slot = asyncio.Event()
+        if not can_start:
+            stats.waiting += 1
+            return slot
+
+        if stats.in_flight >= self._max_in_flight and stats.queued >= self._max_queued:
+            stats.rejected += 1
+            raise BotOverloadedError
+
+        self._queue_slot(slot)
+        return slot
+
+    async def _execute_admitted(
+        self, bot_command: BotCommand, slot: Optional[asyncio.Event]
+    ) -> None:
+        if slot is not None:
+            if not slot.is_set() and slot not in self._queued_slots:
+                self.admission_stats.waiting -= 1
+                self._queue_slot(slot)
+            await slot.wait()
+
+        await self._execute_bot_command(bot_command)
+
+    def _queue_slot(self, slot: asyncio.Event) -> None:
+        # Free slots exist only if no commands are queued for them
+        if self.admission_stats.in_flight < self._max_in_flight:
+            self.admission_stats.in_flight += 1
+            slot.set()
+        else:
+            self.admission_stats.queued += 1
+            self._queued_slots.append(slot)
+
+    def _yield_slot(self, slot: asyncio.Event) -> None:
+        """Give slot to other commands, while command waits for something else.
+
+        Command takes a slot again in `_execute_admitted`.
+        """
+        if slot.is_set():
+            slot.clear()
+            self.admission_stats.waiting += 1
+            self._release_slot()
+        elif slot in self._queued_slots:
+            self._queued_slots.remove(slot)
+            self.admission_stats.queued -= 1
+            self.admission_stats.waiting += 1
+
+    def _release_admission(self, slot: asyncio.Event, _: "asyncio.Task[None]") -> None:
+        if slot.is_set():
+            self._release_slot()
+            return
+
+        if slot in self._queued_slots:
+            self._queued_slots.remove(slot)
+            self.admission_stats.queued -= 1
+        else:
+            self.admission_stats.waiting -= 1
+
+    def _release_slot(self) -> None:
+        if not self._queued_slots:
+            self.admission_stats.in_flight -= 1
+            return
+
+        # Slot is passed to the next queued command without freeing it
+        self.admission_stats.queued -= 1
+        self._queued_slots.popleft().set()
@@ -0,0 +1,111 @@
+"""Execution of commands of each chat in order of arrival."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import UUID
+
+from pybotx.models.commands import BotCommand
+
+from app.bot.admission import AdmissionControlBot
+from app.caching.chat_leases import ChatLeases
+
+
+@dataclass
+class ChatShard:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Commands that are executed or wait for the lock
+    pending: int = 0
+
+
+class ChatOrderedBot(AdmissionControlBot):
+    """Bot that executes commands of one chat one by one in order of arrival.
+
+    Commands of different chats are executed concurrently. Shards of chats are
+    dropped as soon as chats have no pending commands. With `chat_leases`
+    commands of one chat aren't executed at once by different instances too,
+    but their order is kept only within one instance.
+
+    Commands take admission slots only after their chat turn, so commands that
+    wait for their chat don't hold slots of other chats and aren't rejected by
+    `max_queued`, while other chats have free slots.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        chat_ordering: bool = False,
+        chat_leases: Optional[ChatLeases] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._chat_ordering = chat_ordering
+        self._chat_leases = chat_leases
+        self._chat_shards: Dict[UUID, ChatShard] = {}
+
+    @property
+    def active_chats(self) -> int:
+        return len(self._chat_shards)
+
+    def async_execute_bot_command(
+        self, bot_command: BotCommand
+    ) -> "asyncio.Task[None]":
+        chat_id = self._get_ordered_chat_id(bot_command)
+        if chat_id is None:
+            return super().async_execute_bot_command(bot_command)
+
+        # Commands are counted on arrival, so admission knows if chat is busy
+        chat_shard = self._chat_shards.setdefault(chat_id, ChatShard())
+        chat_shard.pending += 1
+        try:
+            task = super().async_execute_bot_command(bot_command)
+        except Exception:
+            self._leave_chat(chat_id)
+            raise
+
+        task.add_done_callback(partial(self._leave_chat, chat_id))
+        return task
+
+    def _can_start(self, bot_command: BotCommand) -> bool:
+        chat_id = self._get_ordered_chat_id(bot_command)
+        return chat_id is None or self._chat_shards[chat_id].pending == 1
+
+    async def _execute_admitted(
+        self, bot_command: BotCommand, slot: Optional[asyncio.Event]
+    ) -> None:
+        chat_id = self._get_ordered_chat_id(bot_command)
+        if chat_id is None:
+            await super()._execute_admitted(bot_command, slot)
+            return
+
+        # Lock is taken without awaits before, so waiters are in arrival order
+        async with self._chat_shards[chat_id].lock:
+            async with self._chat_lease(chat_id, slot):
+                await super()._execute_admitted(bot_command, slot)
+
+    @asynccontextmanager
+    async def _chat_lease(
+        self, chat_id: UUID, slot: Optional[asyncio.Event]
+    ) -> AsyncIterator[None]:
+        if self._chat_leases is None:
+            yield
+            return
+
+        on_wait = partial(self._yield_slot, slot) if slot is not None else None
+        async with self._chat_leases.lease(chat_id, on_wait=on_wait):
+            yield
+
+    def _get_ordered_chat_id(self, bot_command: BotCommand) -> Optional[UUID]:
+        chat = getattr(bot_command, "chat", None)
+        if not self._chat_ordering or chat is None:
+            return None
+
+        return chat.id
+
+    def _leave_chat(self, chat_id: UUID, *_: Any) -> None:
+        chat_shard = self._chat_shards[chat_id]
+        chat_shard.pending -= 1
+        if not chat_shard.pending:
+            self._chat_shards.pop(chat_id)
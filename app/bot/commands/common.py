@@ -12,6 +12,7 @@ from pybotx import (
     StatusRecipient,
 )
 
+from app.bot.status import get_help_text
 from app.resources import strings
 
 collector = HandlerCollector()
@@ -46,12 +47,7 @@ async def help_handler(message: IncomingMessage, bot: Bot) -> None:
 
     status_recipient = StatusRecipient.from_incoming_message(message)
 
-    status = await bot.get_status(status_recipient)
-    command_map = dict(sorted(status.items()))
-
-    answer_body = "\n".join(
-        f"`{command}` -- {description}" for command, description in command_map.items()
-    )
+    answer_body = await get_help_text(bot, status_recipient)
 
     await bot.answer_message(answer_body)
 
@@ -2,14 +2,13 @@
 
 from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
 
+from app.db.sqlalchemy import task_session
+
 
 async def db_session_middleware(
     message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
 ) -> None:
-    session_factory = bot.state.db_session_factory
-
-    async with session_factory() as db_session:
+    async with task_session(bot.state.db_session_factory) as db_session:
         message.state.db_session = db_session
 
         await call_next(message, bot)
-        await db_session.commit()
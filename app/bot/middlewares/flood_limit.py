@@ -0,0 +1,132 @@
+"""Middleware to drop messages of users and chats that send too many messages."""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+from redis.asyncio.client import Redis
+
+from app.logger import logger
+
+FLOOD_SYNC_INTERVAL = 1
+
+
+class FloodLimitMiddleware:
+    """Drop messages over `user_limit` per user and `chat_limit` per chat.
+
+    Messages are counted in fixed windows of `window` seconds. Counters are
+    checked locally, so dropping costs no IO, and are synced with redis in
+    background, so limits are shared by all instances with a sync interval lag.
+    """
+
+    def __init__(
+        self,
+        user_limit: int,
+        chat_limit: int,
+        window: int,
+        redis: Optional[Redis] = None,
+        prefix: Optional[str] = None,
+        sync_interval: float = FLOOD_SYNC_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._user_limit = user_limit
+        self._chat_limit = chat_limit
+        self._window = window
+        self._redis = redis
+        self._prefix = prefix or ""
+        self._sync_interval = sync_interval
+        self._clock = clock
+
+        self._window_id = 0
+        # Messages counted by all instances, as far as it is known
+        self._counts: Dict[str, int] = {}
+        self._unsynced_counts: Dict[str, int] = {}
+        self._sync_task: Optional["asyncio.Task[None]"] = None
+        self._synced_at: float = 0
+
+    async def __call__(
+        self, message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
+    ) -> None:
+        if self._count_message(message):
+            return
+
+        await call_next(message, bot)
+
+    def _count_message(self, message: IncomingMessage) -> bool:
+        now = self._clock()
+        window_id = int(now // self._window)
+        if window_id != self._window_id:
+            self._window_id = window_id
+            self._counts.clear()
+            self._unsynced_counts.clear()
+
+        huid = message.sender.huid
+        chat_id = message.chat.id
+
+        limits: List[Tuple[str, int]] = []
+        if self._user_limit:
+            limits.append((f"user:{huid}", self._user_limit))
+        if self._chat_limit:
+            limits.append((f"chat:{chat_id}", self._chat_limit))
+
+        is_flood = False
+        for counter_key, limit in limits:
+            count = self._counts.get(counter_key, 0) + 1
+            self._counts[counter_key] = count
+            self._unsynced_counts[counter_key] = (
+                self._unsynced_counts.get(counter_key, 0) + 1
+            )
+
+            if count > limit:
+                is_flood = True
+                if count == limit + 1:
+                    logger.warning(f"Messages of `{counter_key}` are dropped")
+
+        self._schedule_sync(now)
+
+        return is_flood
+
+    def _schedule_sync(self, now: float) -> None:
+        if self._redis is None or self._sync_task is not None:
+            return
+
+        if now - self._synced_at < self._sync_interval:
+            return
+
+        self._synced_at = now
+        self._sync_task = asyncio.create_task(self._sync_counts())
+        self._sync_task.add_done_callback(self._sync_done)
+
+    async def _sync_counts(self) -> None:
+        if not self._unsynced_counts:
+            return
+
+        window_id = self._window_id
+        unsynced_counts = self._unsynced_counts
+        self._unsynced_counts = {}
+
+        pipeline = self._redis.pipeline(transaction=False)  # type: ignore
+        for counter_key, count in unsynced_counts.items():
+            redis_key = f"{self._prefix}:flood:{window_id}:{counter_key}"
+            pipeline.incrby(redis_key, count)
+            pipeline.expire(redis_key, self._window * 2)
+        pipeline_results = await pipeline.execute()
+
+        if window_id != self._window_id:
+            return
+
+        total_counts = pipeline_results[::2]
+        for synced_key, total_count in zip(unsynced_counts, total_counts):
+            # Messages counted while counters were synced aren't in total yet
+            self._counts[synced_key] = total_count + self._unsynced_counts.get(
+                synced_key, 0
+            )
+
+    def _sync_done(self, sync_task: "asyncio.Task[None]") -> None:
+        self._sync_task = None
+
+        if not sync_task.cancelled() and sync_task.exception():
+            logger.opt(exception=sync_task.exception()).error(
+                "Flood counters sync failed"
+            )
@@ -0,0 +1,42 @@
+"""Middleware to count and time SQL queries of each message."""
+
+from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+from pybotx_smart_logger import smart_log
+
+from app.db.profiling import QueryStats, query_stats_var
+from app.logger import logger
+from app.settings import settings
+
+
+async def sql_profiling_middleware(
+    message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
+) -> None:
+    query_stats = QueryStats()
+    token = query_stats_var.set(query_stats)
+    try:  # noqa: WPS501
+        await call_next(message, bot)
+    finally:
+        query_stats_var.reset(token)
+        log_query_stats(message, query_stats)
+
+
+def log_query_stats(message: IncomingMessage, query_stats: QueryStats) -> None:
+    total_time = f"{query_stats.total_time:.3f}s"
+    smart_log(f"SQL queries: {query_stats.count}, time: {total_time}")
+
+    command = message.body.split(" ", 1)[0]
+    if settings.SQL_QUERY_BUDGET and query_stats.count > settings.SQL_QUERY_BUDGET:
+        logger.warning(
+            f"Command `{command}` ran {query_stats.count} queries, "
+            f"budget is {settings.SQL_QUERY_BUDGET}"
+        )
+
+    if not settings.SQL_REPEATED_QUERY_LIMIT:
+        return
+
+    for statement, repeats in query_stats.statements.items():
+        if repeats > settings.SQL_REPEATED_QUERY_LIMIT:
+            logger.warning(
+                f"Command `{command}` repeated query {repeats} times, "
+                f"it may be N+1: {statement}"
+            )
@@ -0,0 +1,75 @@
+"""Bot with cached commands menu and help text."""
+
+from typing import Any, Dict, Hashable, Tuple
+
+from pybotx import Bot, BotMenu, StatusRecipient
+
+StatusKey = Tuple[Hashable, ...]
+
+
+class CachedStatusBot(Bot):
+    """Bot that caches commands menu, because commands change on deploy only.
+
+    Menu is cached by bot id and chat type, cache is dropped on startup. Menu
+    isn't cached if some command has visibility function, because the function
+    may depend on anything.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._menus: Dict[StatusKey, BotMenu] = {}
+        self._help_texts: Dict[StatusKey, str] = {}
+        self._is_menu_static = self._check_menu_is_static()
+
+    async def startup(self, *, fetch_tokens: bool = True) -> None:
+        self.invalidate_status_cache()
+        await super().startup(fetch_tokens=fetch_tokens)
+
+    def invalidate_status_cache(self) -> None:
+        """Drop cached menus. Call it after collectors are changed."""
+        self._menus.clear()
+        self._help_texts.clear()
+        self._is_menu_static = self._check_menu_is_static()
+
+    async def get_status(self, status_recipient: StatusRecipient) -> BotMenu:
+        if not self._is_menu_static:
+            return await super().get_status(status_recipient)
+
+        status_key = (status_recipient.bot_id, status_recipient.chat_type)
+        bot_menu = self._menus.get(status_key)
+        if bot_menu is None:
+            bot_menu = await super().get_status(status_recipient)
+            self._menus[status_key] = bot_menu
+
+        return bot_menu
+
+    async def get_help_text(self, status_recipient: StatusRecipient) -> str:
+        if not self._is_menu_static:
+            return format_help_text(await self.get_status(status_recipient))
+
+        status_key = (status_recipient.bot_id, status_recipient.chat_type)
+        help_text = self._help_texts.get(status_key)
+        if help_text is None:
+            help_text = format_help_text(await self.get_status(status_recipient))
+            self._help_texts[status_key] = help_text
+
+        return help_text
+
+    def _check_menu_is_static(self) -> bool:
+        user_commands = self._handler_collector._user_commands_handlers  # noqa: WPS437
+        return not any(callable(command.visible) for command in user_commands.values())
+
+
+def format_help_text(bot_menu: BotMenu) -> str:
+    command_map = dict(sorted(bot_menu.items()))
+
+    return "\n".join(
+        f"`{command}` -- {description}" for command, description in command_map.items()
+    )
+
+
+async def get_help_text(bot: Bot, status_recipient: StatusRecipient) -> str:
+    if isinstance(bot, CachedStatusBot):
+        return await bot.get_help_text(status_recipient)
+
+    return format_help_text(await bot.get_status(status_recipient))
@@ -0,0 +1,188 @@
+"""Memoization of async functions results in redis."""
+
+import asyncio
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+from uuid import uuid4
+
+from pybotx.bot.contextvars import bot_var
+
+from app.caching.redis_repo import RedisRepo
+from app.logger import logger
+
+CACHED_LOCK_TIMEOUT = 10
+CACHED_LOCK_POLL_INTERVAL = 0.05
+
+T = TypeVar("T")  # noqa: WPS111
+AsyncFunc = Callable[..., Awaitable[T]]
+
+
+def get_redis_repo() -> RedisRepo:
+    """Get repo of bot that handles current command."""
+    return bot_var.get().state.redis_repo
+
+
+def default_key(*args: Any, **kwargs: Any) -> Hashable:
+    return (*args, *sorted(kwargs.items()))
+
+
+def cached(  # noqa: WPS211
+    ttl: int,
+    key: Callable[..., Hashable] = default_key,
+    stale_ttl: int = 0,
+    lock_timeout: int = CACHED_LOCK_TIMEOUT,
+    repo_getter: Callable[[], RedisRepo] = get_redis_repo,
+) -> Callable[[AsyncFunc[T]], AsyncFunc[T]]:
+    """Cache async function results in redis for `ttl` seconds.
+
+    `key` builds cache key from function arguments. Concurrent calls with the same
+    key in one process share one function call, and a redis lock makes other
+    replicas wait for the value instead of calling the function too. With
+    `stale_ttl` expired value is returned for `stale_ttl` more seconds while it is
+    refreshed in background.
+
+    Results are serialized with the repo serializer, so they shouldn't be mutated.
+    """
+
+    def decorator(func: AsyncFunc[T]) -> AsyncFunc[T]:
+        cached_func = CachedFunction(
+            func, ttl, key, stale_ttl, lock_timeout, repo_getter
+        )
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:  # noqa: WPS430
+            return await cached_func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class CachedFunction(Generic[T]):
+    """Async function with results cached in redis, see `cached`."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        func: AsyncFunc[T],
+        ttl: int,
+        key: Callable[..., Hashable],
+        stale_ttl: int,
+        lock_timeout: int,
+        repo_getter: Callable[[], RedisRepo],
+    ) -> None:
+        self._func = func
+        self._ttl = ttl
+        self._key = key
+        self._stale_ttl = stale_ttl
+        self._lock_timeout = lock_timeout
+        self._repo_getter = repo_getter
+        self._name = f"{func.__module__}.{func.__qualname__}"
+        # Also keeps references to background refreshes
+        self._inflight_calls: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> T:
+        repo = self._repo_getter()
+        key_args = self._key(*args, **kwargs)
+        if not isinstance(key_args, tuple):
+            key_args = (key_args,)
+        cache_key = ("cached", self._name, *key_args)
+
+        entry = await repo.get(cache_key)
+        if entry is None:
+            # Call is shielded, so cancelled caller doesn't fail other waiters
+            return await asyncio.shield(self._load_once(repo, cache_key, args, kwargs))
+
+        fresh_until, cached_value = entry
+        if fresh_until <= time.time() and cache_key not in self._inflight_calls:
+            refresh_call = self._load_once(repo, cache_key, args, kwargs)
+            refresh_call.add_done_callback(_log_refresh_error)
+
+        return cached_value
+
+    def _load_once(
+        self,
+        repo: RedisRepo,
+        cache_key: Tuple[Hashable, ...],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> "asyncio.Future[T]":
+        inflight_call = self._inflight_calls.get(cache_key)
+        if inflight_call is None:
+            inflight_call = asyncio.ensure_future(
+                self._load(repo, cache_key, args, kwargs)
+            )
+            self._inflight_calls[cache_key] = inflight_call
+            inflight_call.add_done_callback(
+                lambda _: self._inflight_calls.pop(cache_key, None)
+            )
+
+        return inflight_call
+
+    async def _load(
+        self,
+        repo: RedisRepo,
+        cache_key: Tuple[Hashable, ...],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> T:
+        lock_key = ("cached_lock", *cache_key[1:])
+        # Lock is released only by its owner, so expired lock that was taken by
+        # another replica isn't released
+        token = uuid4().hex
+
+        entry = await self._wait_lock(repo, cache_key, lock_key, token)
+        if entry is not None:
+            return entry[1]
+
+        try:  # noqa: WPS501
+            return await self._call(repo, cache_key, args, kwargs)
+        finally:
+            await repo.delete_if_equal(lock_key, token)
+
+    async def _wait_lock(
+        self,
+        repo: RedisRepo,
+        cache_key: Tuple[Hashable, ...],
+        lock_key: Tuple[Hashable, ...],
+        token: str,
+    ) -> Any:
+        """Take lock or return fresh entry loaded by lock owner."""
+        deadline = time.monotonic() + self._lock_timeout
+
+        while not await repo.set_if_absent(lock_key, token, expire=self._lock_timeout):
+            # Value is loaded by another replica
+            await asyncio.sleep(CACHED_LOCK_POLL_INTERVAL)
+
+            entry = await repo.get(cache_key)
+            if entry is not None and entry[0] > time.time():
+                return entry
+
+            if time.monotonic() > deadline:
+                logger.warning(f"Lock of `{self._name}` cached value wasn't released")
+                return None
+
+        return None
+
+    async def _call(
+        self,
+        repo: RedisRepo,
+        cache_key: Tuple[Hashable, ...],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> T:
+        cached_value = await self._func(*args, **kwargs)
+        await repo.set(
+            cache_key,
+            [time.time() + self._ttl, cached_value],
+            expire=self._ttl + self._stale_ttl,
+        )
+
+        return cached_value
+
+
+def _log_refresh_error(refresh_task: "asyncio.Future[Any]") -> None:
+    if not refresh_task.cancelled() and refresh_task.exception():
+        logger.opt(exception=refresh_task.exception()).error(
+            "Cached value refresh failed"
+        )
@@ -1,44 +1,183 @@
 """Repository for work callbacks with redis."""
 
 import asyncio
-import pickle  # noqa: S403
-from typing import Any, Dict, Optional
-from uuid import UUID
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
 
 from pybotx import CallbackNotReceivedError, CallbackRepoProto
 from pybotx.bot.exceptions import BotShuttingDownError, BotXMethodCallbackNotFoundError
 from pybotx.models.method_callbacks import BotXMethodCallback
 from redis.asyncio.client import Redis
 
+from app.caching.serializers import Serializer
+from app.logger import logger
+
+# Route keys and futures should outlive any reasonable callback timeout, they are
+# removed explicitly when callback is popped. Abandoned ones are expired.
+CALLBACK_ROUTE_EXPIRE = 60 * 60
+CALLBACK_MAX_FUTURES = 10000
+CALLBACK_SWEEP_INTERVAL = 60
+
+# Stored results are picked up by late subscribers or by waiting poll.
+CALLBACK_RESULT_EXPIRE = 60
+CALLBACK_RESULT_POLL_INTERVAL = 1
+
+# Look up the instance waiting for the callback and publish it to the instance
+# channel in one round trip.
+PUBLISH_CALLBACK_SCRIPT = """
+local instance_id = redis.call("GET", KEYS[1])
+if not instance_id then
+    return 0
+end
+
+return redis.call("PUBLISH", ARGV[1] .. instance_id, ARGV[2])
+"""
+
+# Store the callback and notify the waiting instance if it is already known.
+STORE_AND_PUBLISH_CALLBACK_SCRIPT = """
+redis.call("SET", KEYS[2], ARGV[2], "EX", ARGV[3])
+
+local instance_id = redis.call("GET", KEYS[1])
+if instance_id then
+    redis.call("PUBLISH", ARGV[1] .. instance_id, ARGV[2])
+end
+
+return 1
+"""
+
+
+@dataclass
+class CallbackRepoStats:
+    local_deliveries: int = 0
+    remote_deliveries: int = 0
+    late_callbacks: int = 0
+    duplicate_callbacks: int = 0
+    futures: int = 0
+    expired_futures: int = 0
+
+    @property
+    def local_hit_ratio(self) -> float:
+        total_deliveries = self.local_deliveries + self.remote_deliveries
+        if not total_deliveries:
+            return 0
+
+        return self.local_deliveries / total_deliveries
+
+
+@dataclass
+class CallbacksWaitResult:
+    callbacks: Dict[UUID, BotXMethodCallback]
+    not_received: List[UUID]
+
 
 class CallbackRedisRepo(CallbackRepoProto):
+    """Callbacks repo with single pubsub subscription per instance.
+
+    Each instance subscribes once to its own channel. Waited callbacks are routed
+    to the instance channel through short-lived route keys and dispatched
+    in-process from the futures table. Callbacks received by the same instance
+    that waits for them are resolved directly, without Redis.
+
+    In durable mode callbacks are also stored in short-lived result keys. So a
+    callback that came before its route was created or while pubsub was
+    reconnecting is still received by the waiting instance.
+
+    Futures table is bounded: entries live no longer than `route_expire` and the
+    oldest entries are expired when the table is full.
+    """
+
     def __init__(
         self,
         redis: Redis,
         prefix: Optional[str] = None,
+        route_expire: int = CALLBACK_ROUTE_EXPIRE,
+        serializer: Optional[Serializer] = None,
+        durable: bool = False,
+        result_expire: int = CALLBACK_RESULT_EXPIRE,
+        result_poll_interval: float = CALLBACK_RESULT_POLL_INTERVAL,
+        max_futures: int = CALLBACK_MAX_FUTURES,
+        sweep_interval: float = CALLBACK_SWEEP_INTERVAL,
     ):
         self._redis = redis
         self._prefix = prefix or ""
+        self._route_expire = route_expire
+        self._serializer = serializer or Serializer()
+        self._durable = durable
+        self._result_expire = result_expire
+        self._result_poll_interval = result_poll_interval
+        self._max_futures = max_futures
+        self._sweep_interval = sweep_interval
         self._futures: Dict[UUID, asyncio.Future[BotXMethodCallback]] = {}
+        # Entries are added with the same lifetime, so deadlines are ordered
+        self._deadlines: Dict[UUID, float] = {}
+        self._sweeper_task: Optional[asyncio.Task[None]] = None
+
+        self._instance_id = uuid4().hex
+        self._publish_callback = redis.register_script(PUBLISH_CALLBACK_SCRIPT)
+        self._store_and_publish_callback = redis.register_script(
+            STORE_AND_PUBLISH_CALLBACK_SCRIPT
+        )
 
         self.pubsub = redis.pubsub()
+        self.stats = CallbackRepoStats()
+
+    async def start(self) -> None:
+        """Subscribe to callbacks addressed to this instance and run sweeper.
+
+        Should be called before `pubsub.run`.
+        """
+        await self.pubsub.subscribe(
+            **{self._channel(self._instance_id): self._message_handler}
+        )
+        self._sweeper_task = asyncio.create_task(self._sweep_expired_futures())
 
     async def create_botx_method_callback(
         self,
         sync_id: UUID,
     ) -> None:
+        if len(self._futures) >= self._max_futures:
+            oldest_sync_id = next(iter(self._futures))
+            logger.warning(
+                f"Callbacks table is full, callback `{oldest_sync_id}` is expired"
+            )
+            self._expire_future(oldest_sync_id)
+
         self._futures[sync_id] = asyncio.Future()
-        await self.pubsub.subscribe(
-            **{f"{self._prefix}:{sync_id}": self._message_handler}
+        loop = asyncio.get_running_loop()
+        self._deadlines[sync_id] = loop.time() + self._route_expire
+        self.stats.futures = len(self._futures)
+
+        await self._redis.set(
+            self._route_key(sync_id), self._instance_id, ex=self._route_expire
         )
 
     async def set_botx_method_callback_result(
         self,
         callback: BotXMethodCallback,
     ) -> None:
-        dump = pickle.dumps(callback)
-        status_code = await self._redis.publish(
-            f"{self._prefix}:{callback.sync_id}", dump
+        if callback.sync_id in self._futures:
+            self.stats.local_deliveries += 1
+            self._resolve_future(callback)
+            return
+
+        self.stats.remote_deliveries += 1
+
+        dump = self._serializer.dumps(callback)
+        if self._durable:
+            await self._store_and_publish_callback(
+                keys=[
+                    self._route_key(callback.sync_id),
+                    self._result_key(callback.sync_id),
+                ],
+                args=[self._channel(""), dump, self._result_expire],
+            )
+            return
+
+        status_code = await self._publish_callback(
+            keys=[self._route_key(callback.sync_id)],
+            args=[self._channel(""), dump],
         )
         if status_code != 1:
             raise BotXMethodCallbackNotFoundError(sync_id=callback.sync_id)
@@ -49,7 +188,15 @@ class CallbackRedisRepo(CallbackRepoProto):
         timeout: float,
     ) -> BotXMethodCallback:
         try:
-            callback = await asyncio.wait_for(self._futures[sync_id], timeout=timeout)
+            future = self._futures[sync_id]
+        except KeyError:
+            raise BotXMethodCallbackNotFoundError(sync_id=sync_id) from None
+
+        try:
+            if self._durable:
+                callback = await self._wait_stored_callback(sync_id, future, timeout)
+            else:
+                callback = await asyncio.wait_for(future, timeout=timeout)
         except asyncio.TimeoutError:
             raise CallbackNotReceivedError(sync_id) from None
         finally:
@@ -57,16 +204,69 @@ class CallbackRedisRepo(CallbackRepoProto):
 
         return callback
 
+    async def wait_botx_method_callbacks(
+        self,
+        sync_ids: Sequence[UUID],
+        timeout: float,
+    ) -> CallbacksWaitResult:
+        """Wait many callbacks under one deadline.
+
+        Callbacks received before the deadline are returned, the rest are listed
+        as not received. All callbacks are popped in one batch.
+        """
+        futures = {
+            sync_id: self._futures[sync_id]
+            for sync_id in sync_ids
+            if sync_id in self._futures
+        }
+
+        try:  # noqa: WPS501
+            if self._durable:
+                await self._wait_stored_callbacks(futures, timeout)
+            elif futures:
+                await asyncio.wait(futures.values(), timeout=timeout)
+        finally:
+            await self.pop_botx_method_callbacks(sync_ids)
+
+        wait_result = CallbacksWaitResult(callbacks={}, not_received=[])
+        for sync_id in sync_ids:
+            callback = _get_callback(futures.get(sync_id))
+            if callback is None:
+                wait_result.not_received.append(sync_id)
+            else:
+                wait_result.callbacks[sync_id] = callback
+
+        return wait_result
+
+    async def pop_botx_method_callbacks(
+        self,
+        sync_ids: Sequence[UUID],
+    ) -> List["asyncio.Future[BotXMethodCallback]"]:
+        """Pop many callbacks in one round trip."""
+        if not sync_ids:
+            return []
+
+        await self._redis.delete(
+            *(self._route_key(sync_id) for sync_id in sync_ids),
+            *(self._result_key(sync_id) for sync_id in sync_ids),
+        )
+
+        return [self._pop_future(sync_id) for sync_id in sync_ids]
+
     async def pop_botx_method_callback(
         self,
         sync_id: UUID,
     ) -> "asyncio.Future[BotXMethodCallback]":
-        await self.pubsub.unsubscribe(f"{self._prefix}:{sync_id}")
-        return self._futures.pop(sync_id)
+        await self._redis.delete(self._route_key(sync_id), self._result_key(sync_id))
+        return self._pop_future(sync_id)
 
     async def stop_callbacks_waiting(self) -> None:
         await self.pubsub.unsubscribe()
 
+        if self._sweeper_task:
+            self._sweeper_task.cancel()
+            await asyncio.gather(self._sweeper_task, return_exceptions=True)
+
         for sync_id, future in self._futures.items():
             if not future.done():
                 future.set_exception(
@@ -75,13 +275,139 @@ class CallbackRedisRepo(CallbackRepoProto):
                     ),
                 )
 
+    def _channel(self, instance_id: str) -> str:
+        return f"{self._prefix}:callbacks:{instance_id}"
+
+    def _route_key(self, sync_id: UUID) -> str:
+        return f"{self._prefix}:callback_routes:{sync_id}"
+
+    def _result_key(self, sync_id: UUID) -> str:
+        return f"{self._prefix}:callback_results:{sync_id}"
+
+    async def _wait_stored_callback(
+        self,
+        sync_id: UUID,
+        future: "asyncio.Future[BotXMethodCallback]",
+        timeout: float,
+    ) -> BotXMethodCallback:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while not future.done():
+            dump = await self._redis.getdel(self._result_key(sync_id))
+            if dump is not None:
+                self._resolve_future(self._serializer.loads(dump))
+                break
+
+            remaining_time = deadline - loop.time()
+            if remaining_time <= 0:
+                raise asyncio.TimeoutError
+
+            # Notification may be lost, so stored result is polled periodically
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    asyncio.shield(future),
+                    timeout=min(self._result_poll_interval, remaining_time),
+                )
+
+        return future.result()
+
+    async def _wait_stored_callbacks(
+        self,
+        futures: Dict[UUID, "asyncio.Future[BotXMethodCallback]"],
+        timeout: float,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:  # noqa: WPS457
+            pending_sync_ids = [
+                sync_id for sync_id, future in futures.items() if not future.done()
+            ]
+            if not pending_sync_ids:
+                return
+
+            dumps = await self._redis.mget(
+                [self._result_key(sync_id) for sync_id in pending_sync_ids]
+            )
+            for dump in dumps:
+                if dump is not None:
+                    self._resolve_future(self._serializer.loads(dump))
+
+            remaining_time = deadline - loop.time()
+            if remaining_time <= 0:
+                return
+
+            # Notifications may be lost, so stored results are polled periodically
+            await asyncio.wait(
+                [futures[sync_id] for sync_id in pending_sync_ids],
+                timeout=min(self._result_poll_interval, remaining_time),
+                return_when=asyncio.ALL_COMPLETED,
+            )
+
     async def _message_handler(self, message: Any) -> None:
         if message["type"] == "message":
-            callback: BotXMethodCallback = pickle.loads(message["data"])  # noqa: S301
+            callback: BotXMethodCallback = self._serializer.loads(message["data"])
+            self._resolve_future(callback)
 
-            future = self._futures[callback.sync_id]
+    def _resolve_future(self, callback: BotXMethodCallback) -> None:
+        future = self._futures.get(callback.sync_id)
 
-            if future.done():
-                future.result()
-            else:
-                future.set_result(callback)
+        if future is None:
+            self.stats.late_callbacks += 1
+            logger.warning(f"Late callback with sync_id `{callback.sync_id}`")
+        elif future.done():
+            self.stats.duplicate_callbacks += 1
+        else:
+            future.set_result(callback)
+
+    def _pop_future(self, sync_id: UUID) -> "asyncio.Future[BotXMethodCallback]":
+        self._deadlines.pop(sync_id, None)
+        future = self._futures.pop(sync_id, None)
+        self.stats.futures = len(self._futures)
+
+        if future is None:  # Already expired
+            future = asyncio.Future()
+            future.cancel()
+
+        return future
+
+    def _expire_future(self, sync_id: UUID) -> None:
+        self._deadlines.pop(sync_id, None)
+        future = self._futures.pop(sync_id)
+        self.stats.futures = len(self._futures)
+        self.stats.expired_futures += 1
+
+        if not future.done():
+            future.set_exception(CallbackNotReceivedError(sync_id))
+            # Abandoned future has no waiters, mark exception as retrieved
+            future.exception()
+
+    async def _sweep_expired_futures(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self._sweep_interval)
+
+            now = loop.time()
+            expired_sync_ids = []
+            for sync_id, deadline in self._deadlines.items():
+                if deadline > now:
+                    break
+
+                expired_sync_ids.append(sync_id)
+
+            for expired_sync_id in expired_sync_ids:
+                self._expire_future(expired_sync_id)
+
+
+def _get_callback(
+    future: Optional["asyncio.Future[BotXMethodCallback]"],
+) -> Optional[BotXMethodCallback]:
+    if future is None or not future.done() or future.cancelled():
+        return None
+
+    if future.exception():
+        return None
+
+    return future.result()
@@ -0,0 +1,85 @@
+"""Leases of chats shared by all bot instances through redis."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Hashable, Optional
+from uuid import uuid4
+
+from redis.asyncio.client import Redis
+
+from app.caching.redis_repo import DELETE_IF_EQUAL_SCRIPT
+from app.logger import logger
+
+CHAT_LEASE_TTL = 30
+CHAT_LEASE_RETRY_INTERVAL = 0.05
+
+# Lease is extended only by its owner, like it is released
+EXTEND_LEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class ChatLeases:
+    """Exclusive leases of chats, so one chat is served by one instance at once.
+
+    Lease expires after `ttl` seconds, if its owner is gone, and is extended while
+    its owner is alive.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: Optional[str] = None,
+        ttl: float = CHAT_LEASE_TTL,
+        retry_interval: float = CHAT_LEASE_RETRY_INTERVAL,
+    ) -> None:
+        self._redis = redis
+        self._prefix = prefix or ""
+        self._ttl_ms = int(ttl * 1000)
+        self._retry_interval = retry_interval
+        self._release_lease = redis.register_script(DELETE_IF_EQUAL_SCRIPT)
+        self._extend_lease = redis.register_script(EXTEND_LEASE_SCRIPT)
+
+    @asynccontextmanager
+    async def lease(
+        self, chat_id: Hashable, on_wait: Optional[Callable[[], None]] = None
+    ) -> AsyncIterator[None]:
+        """Wait until chat is released by other instances and hold it.
+
+        `on_wait` is called once, if chat is held by another instance.
+        """
+        lease_key = f"{self._prefix}:chat_leases:{chat_id}"
+        token = uuid4().hex
+
+        is_acquired = await self._acquire(lease_key, token)
+        if not is_acquired and on_wait is not None:
+            on_wait()
+
+        while not is_acquired:
+            await asyncio.sleep(self._retry_interval)
+            is_acquired = await self._acquire(lease_key, token)
+
+        extend_task = asyncio.create_task(self._extend_periodically(lease_key, token))
+        try:
+            yield
+        finally:
+            extend_task.cancel()
+            await asyncio.gather(extend_task, return_exceptions=True)
+            await self._release_lease(keys=[lease_key], args=[token])
+
+    async def _acquire(self, lease_key: str, token: str) -> bool:
+        is_set = await self._redis.set(lease_key, token, px=self._ttl_ms, nx=True)
+        return bool(is_set)
+
+    async def _extend_periodically(self, lease_key: str, token: str) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self._ttl_ms / 1000 / 3)
+            is_extended = await self._extend_lease(
+                keys=[lease_key], args=[token, self._ttl_ms]
+            )
+            if not is_extended:
+                logger.warning(f"Lease `{lease_key}` is lost")
+                return
@@ -0,0 +1,156 @@
+"""Compression of large values stored in redis."""
+
+import importlib
+import zlib
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Protocol
+
+
+def import_optional(module_name: str) -> Any:
+    """Import module of optional dependency. Return `None` if it isn't installed."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+lz4_frame = import_optional("lz4.frame")
+zstandard = import_optional("zstandard")
+
+# Headers are kept apart from serializer tags, so compressed and plain payloads
+# can be stored together.
+ZLIB_HEADER = 0x10
+LZ4_HEADER = 0x11
+ZSTD_HEADER = 0x12
+
+COMPRESSION_THRESHOLD = 1024
+
+
+class Compressor(Protocol):
+    header: int
+
+    def compress(self, payload: bytes) -> bytes:
+        """Compress payload."""
+
+    def decompress(self, compressed_payload: bytes) -> bytes:
+        """Decompress payload."""
+
+
+class ZlibCompressor:
+    header = ZLIB_HEADER
+
+    def compress(self, payload: bytes) -> bytes:
+        return zlib.compress(payload, 1)
+
+    def decompress(self, compressed_payload: bytes) -> bytes:
+        return zlib.decompress(compressed_payload)
+
+
+class LZ4Compressor:
+    header = LZ4_HEADER
+
+    def compress(self, payload: bytes) -> bytes:
+        return lz4_frame.compress(payload)
+
+    def decompress(self, compressed_payload: bytes) -> bytes:
+        return lz4_frame.decompress(compressed_payload)
+
+
+class ZstdCompressor:
+    header = ZSTD_HEADER
+
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=1)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, payload: bytes) -> bytes:
+        return self._compressor.compress(payload)
+
+    def decompress(self, compressed_payload: bytes) -> bytes:
+        return self._decompressor.decompress(compressed_payload)
+
+
+def get_available_compressors() -> Dict[str, Compressor]:
+    compressors: Dict[str, Compressor] = {"zlib": ZlibCompressor()}
+    if lz4_frame is not None:
+        compressors["lz4"] = LZ4Compressor()
+    if zstandard is not None:
+        compressors["zstd"] = ZstdCompressor()
+
+    return compressors
+
+
+COMPRESSORS_BY_HEADER = MappingProxyType(
+    {
+        compressor.header: compressor
+        for compressor in get_available_compressors().values()
+    }
+)
+
+
+@dataclass
+class CompressionStats:
+    compressed_values: int = 0
+    incompressible_values: int = 0
+    plain_bytes: int = 0
+    compressed_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        if not self.compressed_bytes:
+            return 0
+
+        return self.plain_bytes / self.compressed_bytes
+
+
+class Compression:
+    """Compress payloads larger than `threshold` bytes with given compressor.
+
+    Payload is prefixed with compressor header and stays plain if compression
+    doesn't make it smaller.
+    """
+
+    def __init__(
+        self,
+        compressor_name: str = "zlib",
+        threshold: int = COMPRESSION_THRESHOLD,
+    ) -> None:
+        try:
+            self._compressor = get_available_compressors()[compressor_name]
+        except KeyError:
+            raise ValueError(
+                f"Compressor `{compressor_name}` is unknown or isn't installed"
+            ) from None
+
+        self._threshold = threshold
+
+        self.stats = CompressionStats()
+
+    def compress(self, payload: bytes) -> bytes:
+        if len(payload) < self._threshold:
+            return payload
+
+        compressed_payload = bytes((self._compressor.header,))
+        compressed_payload += self._compressor.compress(payload)
+        if len(compressed_payload) >= len(payload):
+            self.stats.incompressible_values += 1
+            return payload
+
+        self.stats.compressed_values += 1
+        self.stats.plain_bytes += len(payload)
+        self.stats.compressed_bytes += len(compressed_payload)
+        return compressed_payload
+
+
+def decompress(dump: bytes) -> Optional[bytes]:
+    """Decompress payload. Return `None` if it isn't compressed.
+
+    Payload compressed with any installed compressor is decompressed, so
+    compression can be turned on, off or changed without migration.
+    """
+    compressor = COMPRESSORS_BY_HEADER.get(dump[0])
+    if compressor is None:
+        return None
+
+    return compressor.decompress(dump[1:])
@@ -0,0 +1,55 @@
+"""Encoding of python values to redis keys."""
+
+import hashlib
+import pickle  # noqa: S403
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Hashable, Tuple
+from uuid import UUID
+
+KEY_TYPE_TAGS = MappingProxyType({str: "s", int: "i"})
+
+# Bools and floats are left out, they are equal to ints and would share memoized keys
+TUPLE_ITEM_TYPES = frozenset((str, int, UUID, type(None)))
+
+ENCODED_KEYS_CACHE_SIZE = 4096
+
+
+def encode_key(arg: Hashable) -> str:
+    """Encode key readably when it is possible and hash it otherwise.
+
+    Readable keys are tagged with the key type, so they don't collide with each
+    other or with hashes.
+    """
+    arg_type = type(arg)
+
+    type_tag = KEY_TYPE_TAGS.get(arg_type)
+    if type_tag is not None:
+        return f"{type_tag}:{arg}"
+
+    if arg_type is UUID:
+        return _encode_uuid(arg)  # type: ignore
+
+    if arg_type is tuple and _has_readable_items(arg):  # type: ignore
+        return _encode_tuple(arg)  # type: ignore
+
+    return hash_key(arg)
+
+
+def hash_key(arg: Hashable) -> str:
+    """Encode any key. Values were stored with such keys by previous versions."""
+    return hashlib.md5(pickle.dumps(arg)).hexdigest()  # noqa: S303
+
+
+@lru_cache(maxsize=ENCODED_KEYS_CACHE_SIZE)
+def _encode_uuid(arg: UUID) -> str:
+    return f"u:{arg}"
+
+
+@lru_cache(maxsize=ENCODED_KEYS_CACHE_SIZE)
+def _encode_tuple(arg: Tuple[Hashable, ...]) -> str:
+    return f"t:{arg!r}"
+
+
+def _has_readable_items(arg: Tuple[Hashable, ...]) -> bool:
+    return TUPLE_ITEM_TYPES.issuperset(type(element) for element in arg)
@@ -0,0 +1,93 @@
+"""In-process cache for hot values stored in redis."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+# Returned on miss, because `None` can be cached as well.
+MISSING: Any = object()
+
+
+@dataclass
+class LocalCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total_reads = self.hits + self.misses
+        if not total_reads:
+            return 0
+
+        return self.hits / total_reads
+
+
+class LocalCache:
+    """LRU cache with size limit and TTL.
+
+    Values are stored as is, so they shouldn't be mutated after `get` or `set`.
+    `version` is incremented on every invalidation, so value that was read
+    while it was invalidated can be dropped instead of being cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self.version = 0
+        self.stats = LocalCacheStats()
+
+    def get(self, key: str) -> Any:
+        try:
+            expire_at, cached_value = self._entries[key]
+        except KeyError:
+            self.stats.misses += 1
+            return MISSING
+
+        if expire_at <= self._clock():
+            del self._entries[key]  # noqa: WPS420
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            self.stats.size = len(self._entries)
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return cached_value
+
+    def set(self, key: str, cached_value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None or ttl > self._ttl:
+            ttl = self._ttl
+
+        self._entries[key] = (self._clock() + ttl, cached_value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+        self.stats.size = len(self._entries)
+
+    def delete(self, key: str) -> None:
+        self.version += 1
+        if self._entries.pop(key, None) is not None:
+            self.stats.invalidations += 1
+            self.stats.size = len(self._entries)
+
+    def clear(self) -> None:
+        self.version += 1
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self.stats.size = 0
@@ -0,0 +1,102 @@
+"""Rate limiter shared by all bot instances through redis."""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from httpx import Request
+from redis.asyncio.client import Redis
+
+# Tokens that were taken from redis, but weren't used for a while, are dropped,
+# so bursts of instances don't exceed the limit much.
+PREFETCHED_TOKENS_TTL = 1
+
+# Refill bucket by elapsed time and take up to requested number of tokens.
+# Returns taken tokens number and seconds to wait if bucket is empty.
+TAKE_TOKENS_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local redis_time = redis.call("TIME")
+local now = tonumber(redis_time[1]) + tonumber(redis_time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local taken = math.min(requested, math.floor(tokens))
+tokens = tokens - taken
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+
+local wait_time = 0
+if taken == 0 then
+    wait_time = (1 - tokens) / rate
+end
+
+return {taken, tostring(wait_time)}
+"""
+
+
+class RateLimiter:
+    """Token bucket limiter, buckets are stored in redis.
+
+    `rate` tokens per second are added to each bucket up to `capacity`. Up to
+    `prefetch` tokens are taken from redis at once and used locally, so most
+    acquires don't need redis round trip.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        rate: float,
+        capacity: int,
+        prefetch: int = 1,
+        prefix: Optional[str] = None,
+    ) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._prefetch = min(prefetch, capacity)
+        self._prefix = prefix or ""
+        self._take_tokens = redis.register_script(TAKE_TOKENS_SCRIPT)
+
+        # Bucket name: number of tokens and time when they were taken
+        self._prefetched_tokens: Dict[str, Tuple[int, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, bucket: str) -> None:
+        """Wait for a token from bucket."""
+        if self._take_prefetched_token(bucket):
+            return
+
+        lock = self._locks.setdefault(bucket, asyncio.Lock())
+        async with lock:
+            # Tokens could be prefetched while lock was waited
+            if self._take_prefetched_token(bucket):
+                return
+
+            while True:  # noqa: WPS457
+                taken, wait_time = await self._take_tokens(
+                    keys=[f"{self._prefix}:rate_limits:{bucket}"],
+                    args=[self._rate, self._capacity, self._prefetch],
+                )
+                if taken:
+                    self._prefetched_tokens[bucket] = (taken - 1, time.monotonic())
+                    return
+
+                await asyncio.sleep(float(wait_time))
+
+    async def limit_request(self, request: Request) -> None:
+        """Wait for a token of request host. Used as `httpx` request hook."""
+        await self.acquire(request.url.host)
+
+    def _take_prefetched_token(self, bucket: str) -> bool:
+        tokens, taken_at = self._prefetched_tokens.get(bucket, (0, 0))
+        if not tokens or time.monotonic() - taken_at > PREFETCHED_TOKENS_TTL:
+            return False
+
+        self._prefetched_tokens[bucket] = (tokens - 1, taken_at)
+        return True
@@ -1,23 +1,74 @@
 """Repository for work with redis."""
 
-import hashlib
-import pickle  # noqa: S403
-from typing import Any, Hashable, Optional
+from typing import Any, Hashable, Iterable, List, Mapping, Optional, Sequence
+from uuid import uuid4
 
 from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline, PubSub
+
+from app.caching.keys import encode_key, hash_key
+from app.caching.local_cache import MISSING, LocalCache
+from app.caching.serializers import Serializer
+
+# Value is deleted only by the one who set it, e.g. lock is released by its owner
+DELETE_IF_EQUAL_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
 
 
 class RedisRepo:
+    """Key-value repo with optional in-process tier.
+
+    With `local_cache` serialized values are also cached in-process and are decoded
+    on every read, so callers never share mutable objects. Writes and deletes are
+    published to invalidation channel, so other instances drop their copies.
+    Invalidations sent while pubsub was reconnecting are lost, so local cache TTL
+    is an upper bound of staleness.
+
+    Values stored by previous versions with hashed keys are read only in
+    `legacy_keys_read` mode. In this mode writes and deletes also remove legacy
+    keys, so stale values don't show up again.
+    """
+
     def __init__(
         self,
         redis: aioredis.Redis,
         prefix: Optional[str] = None,
         expire: Optional[int] = None,
+        serializer: Optional[Serializer] = None,
+        local_cache: Optional[LocalCache] = None,
+        legacy_keys_read: bool = False,
     ) -> None:
         self._redis = redis
         self._prefix = prefix
         self._expire = expire
+        self._serializer = serializer or Serializer()
         self._delimiter = "_"
+        self._legacy_keys_read = legacy_keys_read
+        self._instance_id = uuid4().hex
+        channel_prefix = prefix or ""
+        self._invalidations_channel = f"{channel_prefix}:cache_invalidations"
+
+        self._delete_if_equal = redis.register_script(DELETE_IF_EQUAL_SCRIPT)
+
+        self.local_cache = local_cache
+
+    @property
+    def serializer(self) -> Serializer:
+        return self._serializer
+
+    async def subscribe_invalidations(self, pubsub: PubSub) -> None:
+        """Drop local values changed by other instances.
+
+        Should be called before `pubsub.run`.
+        """
+        if self.local_cache is not None:
+            await pubsub.subscribe(
+                **{self._invalidations_channel: self._invalidation_handler}
+            )
 
     async def ping(self) -> Optional[str]:
         try:
@@ -28,33 +79,214 @@ class RedisRepo:
         return None
 
     async def get(self, key: Hashable, default: Any = None) -> Any:
-        cached_data = await self._redis.get(self._key(key))
-        if cached_data is None:
-            return default
+        if self.local_cache is None and not self._legacy_keys_read:
+            return self._load(await self._redis.get(self._key(key)), default)
+
+        storage_values = await self.get_many([key], default)
+        return storage_values[0]
 
-        return pickle.loads(cached_data)  # noqa: S301
+    async def get_many(  # noqa: WPS615
+        self, keys: Sequence[Hashable], default: Any = None
+    ) -> List[Any]:
+        """Get values in one round trip. Values are in the same order as keys."""
+        dumps = self._get_local_dumps([self._key(key) for key in keys])
+
+        missed_indexes = [
+            index for index, key_dumps in enumerate(dumps) if key_dumps is MISSING
+        ]
+        if missed_indexes:
+            missed_dumps = await self._read_dumps(
+                [keys[missed_index] for missed_index in missed_indexes]
+            )
+            for missed_index, read_dumps in zip(missed_indexes, missed_dumps):
+                dumps[missed_index] = read_dumps
+
+        return [self._load(value_dumps, default) for value_dumps in dumps]
 
     async def set(
         self, key: Hashable, storage_value: Any, expire: Optional[int] = None
     ) -> None:
+        await self.set_many({key: storage_value}, expire)
+
+    async def set_many(  # noqa: WPS615
+        self, storage_values: Mapping[Hashable, Any], expire: Optional[int] = None
+    ) -> None:
+        """Set values in one round trip."""
+        if expire is None:
+            expire = self._expire
+
+        pipeline = self._redis.pipeline(transaction=False)
+        redis_keys = []
+        for key, storage_value in storage_values.items():
+            redis_key = self._key(key)
+            dumps = self._serializer.dumps(storage_value)
+            pipeline.set(redis_key, dumps, ex=expire)
+            redis_keys.append(redis_key)
+
+        legacy_keys = self._legacy_keys(storage_values.keys())
+        if legacy_keys:
+            pipeline.delete(*legacy_keys)
+
+        self._invalidate(pipeline, redis_keys)
+        await pipeline.execute()
+
+    async def set_if_absent(
+        self, key: Hashable, storage_value: Any, expire: Optional[int] = None
+    ) -> bool:
+        """Set value only if key doesn't exist. Return `True` if value was set.
+
+        Legacy keys aren't checked, so it shouldn't be used for keys that were set
+        by previous versions.
+        """
         if expire is None:
             expire = self._expire
 
-        dumps = pickle.dumps(storage_value)
-        await self._redis.set(self._key(key), dumps, ex=expire)
+        redis_key = self._key(key)
+        dumps = self._serializer.dumps(storage_value)
+        is_set = await self._redis.set(redis_key, dumps, ex=expire, nx=True)
+        return bool(is_set)
+
+    async def delete_if_equal(self, key: Hashable, storage_value: Any) -> bool:
+        """Delete value only if it is equal to given one. Return `True` if deleted.
+
+        Legacy keys aren't checked, so it should be used with `set_if_absent` only.
+        """
+        redis_key = self._key(key)
+        dumps = self._serializer.dumps(storage_value)
+
+        pipeline = self._redis.pipeline(transaction=False)
+        await self._delete_if_equal(keys=[redis_key], args=[dumps], client=pipeline)
+        self._invalidate(pipeline, [redis_key])
+        pipeline_results = await pipeline.execute()
+
+        return bool(pipeline_results[0])
 
     async def delete(self, key: Hashable) -> None:
-        await self._redis.delete(self._key(key))
+        await self.delete_many([key])
+
+    async def delete_many(self, keys: Sequence[Hashable]) -> None:
+        """Delete values in one round trip."""
+        if not keys:
+            return
+
+        redis_keys = [self._key(key) for key in keys]
+
+        pipeline = self._redis.pipeline(transaction=False)
+        pipeline.delete(*redis_keys)
+        legacy_keys = self._legacy_keys(keys)
+        if legacy_keys:
+            pipeline.delete(*legacy_keys)
+        self._invalidate(pipeline, redis_keys)
+        await pipeline.execute()
 
     async def rget(self, key: Hashable, default: Any = None) -> Any:
-        storage_value = await self.get(key, default)
-        await self.delete(key)
-        return storage_value
+        """Get and delete value atomically."""
+        redis_key = self._key(key)
+
+        pipeline = self._redis.pipeline(transaction=False)
+        pipeline.getdel(redis_key)
+        if self._legacy_keys_read:
+            pipeline.getdel(self._legacy_key(key))
+        self._invalidate(pipeline, [redis_key])
+        pipeline_results = await pipeline.execute()
+
+        cached_data = pipeline_results[0]
+        if cached_data is None and self._legacy_keys_read:
+            cached_data = pipeline_results[1]
+
+        return self._load(cached_data, default)
+
+    def _get_local_dumps(self, redis_keys: List[str]) -> List[Any]:
+        if self.local_cache is None:
+            return [MISSING for _ in redis_keys]
+
+        return [self.local_cache.get(redis_key) for redis_key in redis_keys]
+
+    async def _read_dumps(self, keys: Sequence[Hashable]) -> List[Optional[bytes]]:
+        redis_keys = [self._key(key) for key in keys]
+        cache_version = self.local_cache.version if self.local_cache else 0
+
+        pipeline = self._redis.pipeline(transaction=False)
+        pipeline.mget(redis_keys)
+        if self._legacy_keys_read:
+            pipeline.mget([self._legacy_key(key) for key in keys])
+        if self.local_cache is not None:
+            for redis_key in redis_keys:
+                pipeline.ttl(redis_key)
+        pipeline_results = await pipeline.execute()
+
+        dumps = pipeline_results.pop(0)
+        if self._legacy_keys_read:
+            legacy_dumps = pipeline_results.pop(0)
+            dumps = [
+                legacy_value_dumps if value_dumps is None else value_dumps
+                for value_dumps, legacy_value_dumps in zip(dumps, legacy_dumps)
+            ]
+
+        self._fill_local_cache(redis_keys, dumps, pipeline_results, cache_version)
+        return dumps
+
+    def _fill_local_cache(
+        self,
+        redis_keys: List[str],
+        dumps: List[Optional[bytes]],
+        ttls: List[int],
+        cache_version: int,
+    ) -> None:
+        # Values may be already changed if invalidation came while they were read
+        if self.local_cache is None or self.local_cache.version != cache_version:
+            return
+
+        for redis_key, value_dumps, ttl in zip(redis_keys, dumps, ttls):
+            if value_dumps is not None:
+                self.local_cache.set(redis_key, value_dumps, ttl if ttl > 0 else None)
+
+    def _load(self, dumps: Optional[bytes], default: Any) -> Any:
+        if dumps is None:
+            return default
+
+        return self._serializer.loads(dumps)
+
+    def _invalidate(self, pipeline: Pipeline, redis_keys: List[str]) -> None:
+        if self.local_cache is None:
+            return
+
+        for redis_key in redis_keys:
+            self.local_cache.delete(redis_key)
+            pipeline.publish(self._invalidations_channel, self._invalidation(redis_key))
+
+    def _invalidation(self, redis_key: str) -> str:
+        return f"{self._instance_id}:{redis_key}"
+
+    async def _invalidation_handler(self, message: Any) -> None:
+        if message["type"] != "message" or self.local_cache is None:
+            return
+
+        instance_id, redis_key = message["data"].decode().split(":", 1)
+        if instance_id != self._instance_id:
+            self.local_cache.delete(redis_key)
 
     def _key(self, arg: Hashable) -> str:
+        return self._prefixed(encode_key(arg))
+
+    def _legacy_key(self, arg: Hashable) -> str:
+        return self._prefixed(hash_key(arg))
+
+    def _legacy_keys(self, args: Iterable[Hashable]) -> List[str]:
+        legacy_keys: List[str] = []
+        if not self._legacy_keys_read:
+            return legacy_keys
+
+        for arg in args:
+            # Keys without readable encoding are hashed as before
+            legacy_key = self._legacy_key(arg)
+            if legacy_key != self._key(arg):
+                legacy_keys.append(legacy_key)
+
+        return legacy_keys
+
+    def _prefixed(self, key: str) -> str:
         if self._prefix is not None:
-            prefix = self._prefix + self._delimiter
-        else:
-            prefix = ""
+            return self._prefix + self._delimiter + key
 
-        return prefix + hashlib.md5(pickle.dumps(arg)).hexdigest()  # noqa: S303
+        return key
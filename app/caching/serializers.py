@@ -0,0 +1,123 @@
+"""Serializers for values stored in redis."""
+
+import pickle  # noqa: S403
+from typing import Any, Dict, Optional, Protocol, Sequence
+from uuid import UUID
+
+import orjson
+from pybotx.models.method_callbacks import (
+    BotAPIMethodFailedCallback,
+    BotAPIMethodSuccessfulCallback,
+)
+
+from app.caching.compression import Compression, decompress
+
+# Pickle payloads start with PROTO opcode, so they are stored without a tag and
+# values pickled before payloads got tags are read the same way.
+PICKLE_TAG = 0x80
+
+CALLBACK_TYPES = frozenset((BotAPIMethodSuccessfulCallback, BotAPIMethodFailedCallback))
+
+
+class Codec(Protocol):
+    """Encoding of values of some kind. `tag` is stored as payload first byte."""
+
+    tag: int
+
+    def can_encode(self, storage_value: Any) -> bool:
+        """Check that value can be restored after encoding."""
+
+    def encode(self, storage_value: Any) -> bytes:
+        """Encode value."""
+
+    def decode(self, dump: bytes) -> Any:
+        """Decode value."""
+
+
+class BotXMethodCallbackCodec:
+    tag = 3
+
+    def can_encode(self, storage_value: Any) -> bool:
+        # Exact types are checked, because `isinstance` of pydantic models is slow
+        return type(storage_value) in CALLBACK_TYPES  # noqa: WPS516
+
+    def encode(self, storage_value: Any) -> bytes:
+        # Fields of callbacks are plain values, so they are dumped without `dict()`
+        return orjson.dumps(storage_value.__dict__)
+
+    def decode(self, dump: bytes) -> Any:
+        # Payload was validated before encoding, so validation is skipped here
+        callback_data = orjson.loads(dump)
+        callback_data["sync_id"] = UUID(callback_data["sync_id"])
+
+        if callback_data["status"] == "ok":
+            return BotAPIMethodSuccessfulCallback.construct(**callback_data)
+
+        return BotAPIMethodFailedCallback.construct(**callback_data)
+
+
+class Serializer:
+    """Serializer that tags payloads with the codecs they were encoded with.
+
+    Value is encoded with the first codec that supports it. Other values are
+    pickled, because pickle is the fastest for plain python values. Set
+    `legacy_writes` while older replicas are still running, so they can read new
+    payloads.
+
+    Large payloads are compressed with `compression`, if it is set.
+    """
+
+    def __init__(
+        self,
+        codecs: Optional[Sequence[Codec]] = None,
+        legacy_writes: bool = False,
+        compression: Optional[Compression] = None,
+    ) -> None:
+        if codecs is None:
+            codecs = [BotXMethodCallbackCodec()]
+
+        self._codecs = codecs
+        self._codecs_by_tag: Dict[int, Codec] = {codec.tag: codec for codec in codecs}
+        self._legacy_writes = legacy_writes
+        self.compression = compression
+
+        assert PICKLE_TAG not in self._codecs_by_tag, "Tag is reserved"
+
+    def dumps(self, storage_value: Any) -> bytes:
+        if self._legacy_writes:
+            return pickle.dumps(storage_value)
+
+        dump = self._encode(storage_value)
+        if self.compression is not None:
+            return self.compression.compress(dump)
+
+        return dump
+
+    def loads(self, dump: bytes) -> Any:
+        decompressed_dump = decompress(dump)
+        if decompressed_dump is not None:
+            dump = decompressed_dump
+
+        tag = dump[0]
+        if tag == PICKLE_TAG:
+            return pickle.loads(dump)  # noqa: S301
+
+        try:
+            codec = self._codecs_by_tag[tag]
+        except KeyError:
+            raise ValueError(f"Unknown serializer tag `{tag}`") from None
+
+        return codec.decode(dump[1:])
+
+    def _encode(self, storage_value: Any) -> bytes:
+        for codec in self._codecs:
+            if codec.can_encode(storage_value):
+                try:
+                    dump = codec.encode(storage_value)
+                except TypeError:
+                    # Codec may reject value it can't restore, then next one is tried
+                    continue
+
+                return bytes((codec.tag,)) + dump
+
+        return pickle.dumps(storage_value, protocol=pickle.HIGHEST_PROTOCOL)
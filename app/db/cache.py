@@ -0,0 +1,115 @@
+"""Cache of objects read by primary key."""
+
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.caching.redis_repo import RedisRepo
+from app.logger import logger
+
+REPO_CACHE_EXPIRE = 60 * 5
+
+PENDING_INVALIDATIONS = "pending_cache_invalidations"
+COMMITTED_INVALIDATIONS = "committed_cache_invalidations"
+
+ObjectData = Optional[Dict[str, Any]]
+ObjectLoader = Callable[[], Awaitable[ObjectData]]
+
+
+class RepoCache:
+    """Read-through cache of objects data in `RedisRepo`.
+
+    Every object has a version, which is changed after transaction that writes
+    the object commits. Cached data is stored with version read before the object
+    was loaded, so data loaded concurrently with a write isn't used after it.
+    """
+
+    def __init__(
+        self, redis_repo: RedisRepo, namespace: str, expire: int = REPO_CACHE_EXPIRE
+    ) -> None:
+        self._redis_repo = redis_repo
+        self._namespace = namespace
+        self._expire = expire
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        pkey_val: Any,
+        load: ObjectLoader,
+    ) -> ObjectData:
+        # Session should see its own uncommitted writes
+        if (self, pkey_val) in session.info.get(PENDING_INVALIDATIONS, ()):
+            return await load()
+
+        version, cached_entry = await self._redis_repo.get_many(
+            [self._version_key(pkey_val), self._entry_key(pkey_val)]
+        )
+        if cached_entry is not None and cached_entry[0] == version:
+            return cached_entry[1]
+
+        object_data = await load()
+        if object_data is not None:
+            await self._redis_repo.set(
+                self._entry_key(pkey_val), [version, object_data], expire=self._expire
+            )
+
+        return object_data
+
+    def invalidate_on_commit(self, session: AsyncSession, pkey_val: Any) -> None:
+        """Invalidate object after current transaction of session commits."""
+        session.info.setdefault(PENDING_INVALIDATIONS, []).append((self, pkey_val))
+
+    async def invalidate(self, pkey_vals: List[Any]) -> None:
+        # Versions outlive entries, so entries stored before first write expire first
+        await self._redis_repo.set_many(
+            {self._version_key(pkey_val): uuid4().hex for pkey_val in pkey_vals},
+            expire=self._expire * 2,
+        )
+
+    def _entry_key(self, pkey_val: Any) -> Tuple[str, Any]:
+        return (f"{self._namespace}_cache", pkey_val)
+
+    def _version_key(self, pkey_val: Any) -> Tuple[str, Any]:
+        return (f"{self._namespace}_cache_version", pkey_val)
+
+
+@event.listens_for(Session, "after_commit")
+def commit_invalidations(session: Session) -> None:
+    pending_invalidations = session.info.pop(PENDING_INVALIDATIONS, None)
+    if pending_invalidations:
+        session.info.setdefault(COMMITTED_INVALIDATIONS, []).extend(
+            pending_invalidations
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_invalidations(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+async def invalidate_committed(session: AsyncSession) -> None:
+    """Invalidate objects written by committed transactions of session.
+
+    Await it right after commit, so next reads don't get objects from cache.
+    """
+    committed_invalidations = session.info.pop(COMMITTED_INVALIDATIONS, None)
+    if not committed_invalidations:
+        return
+
+    try:
+        await invalidate(committed_invalidations)
+    except Exception:
+        logger.exception("Cache invalidation failed")
+
+
+async def invalidate(pending_invalidations: List[Tuple[RepoCache, Any]]) -> None:
+    pkey_vals_by_cache: Dict[RepoCache, List[Any]] = defaultdict(list)
+    for cache, pkey_val in pending_invalidations:
+        pkey_vals_by_cache[cache].append(pkey_val)
+
+    for repo_cache, pkey_vals in pkey_vals_by_cache.items():
+        await repo_cache.invalidate(pkey_vals)
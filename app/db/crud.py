@@ -1,14 +1,17 @@
 """CRUD implementation."""
 
-from typing import Any, Dict, TypeVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, TypeVar
 
 from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.inspection import inspect
 
 from app.db.sqlalchemy import AsyncSession
 
 T = TypeVar("T")  # noqa: WPS111
 
+STREAM_BATCH_SIZE = 1000
+
 
 class CRUD:
     """CRUD operations for models."""
@@ -18,28 +21,103 @@ class CRUD:
         self._cls_model = cls_model
 
     async def create(self, *, model_data: Dict[str, Any]) -> Any:
-        """Create object."""
-        query = insert(self._cls_model).values(**model_data)
+        """Create object and return it."""
+        query = insert(self._cls_model).values(**model_data).returning(self._cls_model)
+
+        rows = await self._session.scalars(query)
+        return rows.one()
+
+    async def create_many(self, *, models_data: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Create objects in batches and return them in the same order."""
+        if not models_data:
+            return []
+
+        query = insert(self._cls_model).returning(
+            self._cls_model, sort_by_parameter_order=True
+        )
 
-        res = await self._session.execute(query)  # type: ignore
-        return res.inserted_primary_key  # type: ignore
+        rows = await self._session.scalars(query, models_data)
+        return list(rows.all())
 
     async def update(
         self,
         *,
         pkey_val: Any,
         model_data: Dict[str, Any],
-    ) -> None:
-        """Update object by primary key."""
+    ) -> Any:
+        """Update object by primary key and return it."""
         primary_key = inspect(self._cls_model).primary_key[0]
         query = (
             update(self._cls_model)  # type: ignore
             .where(primary_key == pkey_val)
             .values(**model_data)
-            .execution_options(synchronize_session="fetch")
+            .returning(self._cls_model)
+            .execution_options(populate_existing=True)
         )
 
-        await self._session.execute(query)
+        rows = await self._session.scalars(query)
+        return rows.one()
+
+    async def update_many(self, *, models_data: Sequence[Dict[str, Any]]) -> None:
+        """Update objects by primary keys, that are in models data, in batches."""
+        if not models_data:
+            return
+
+        await self._session.execute(
+            update(self._cls_model), models_data  # type: ignore
+        )
+
+    async def upsert(
+        self,
+        *,
+        model_data: Dict[str, Any],
+        conflict_fields: Optional[List[str]] = None,
+    ) -> Any:
+        """Create object or update it on conflict and return it.
+
+        Conflict is checked by primary key, unless `conflict_fields` are set.
+        """
+        upserted_objects = await self.upsert_many(
+            models_data=[model_data], conflict_fields=conflict_fields
+        )
+        return upserted_objects[0]
+
+    async def upsert_many(
+        self,
+        *,
+        models_data: Sequence[Dict[str, Any]],
+        conflict_fields: Optional[List[str]] = None,
+    ) -> List[Any]:
+        """Create objects or update them on conflict in batches.
+
+        Objects are returned in the same order. All models data should have the
+        same fields.
+        """
+        if not models_data:
+            return []
+
+        if conflict_fields is None:
+            conflict_fields = [
+                column.name for column in inspect(self._cls_model).primary_key
+            ]
+
+        update_fields = [
+            field for field in models_data[0] if field not in conflict_fields
+        ]
+        if not update_fields:
+            # Nothing to update, but conflicting rows are returned only if updated
+            update_fields = conflict_fields
+
+        insert_query = pg_insert(self._cls_model)
+        query = insert_query.on_conflict_do_update(
+            index_elements=conflict_fields,
+            set_={field: insert_query.excluded[field] for field in update_fields},
+        ).returning(self._cls_model, sort_by_parameter_order=True)
+
+        rows = await self._session.scalars(
+            query, models_data, execution_options={"populate_existing": True}
+        )
+        return list(rows.all())
 
     async def delete(self, *, pkey_val: Any) -> None:
         """Delete object by primary key value."""
@@ -85,3 +163,42 @@ class CRUD:
 
         rows = await self._session.execute(query)  # type: ignore
         return rows.scalars().all()
+
+    async def iterate_all(
+        self, *, batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[Any]:
+        """Iterate over all objects, fetched from server-side cursor in batches."""
+        query = select(self._cls_model).execution_options(yield_per=batch_size)
+
+        rows = await self._session.stream_scalars(query)
+        async for row in rows:
+            yield row
+
+    async def iterate_by_field(
+        self, *, field: str, field_value: Any, batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[Any]:
+        """Iterate over objects with condition field=val in batches."""
+        query = (
+            select(self._cls_model)
+            .where(getattr(self._cls_model, field) == field_value)
+            .execution_options(yield_per=batch_size)
+        )
+
+        rows = await self._session.stream_scalars(query)
+        async for row in rows:
+            yield row
+
+    async def get_page(
+        self, *, after_pkey_val: Optional[Any] = None, page_size: int
+    ) -> List[Any]:
+        """Get objects ordered by primary key, that follow `after_pkey_val`.
+
+        Pass primary key of the last object of previous page to get next page.
+        """
+        primary_key = inspect(self._cls_model).primary_key[0]
+        query = select(self._cls_model).order_by(primary_key).limit(page_size)
+        if after_pkey_val is not None:
+            query = query.where(primary_key > after_pkey_val)
+
+        rows = await self._session.execute(query)  # type: ignore
+        return list(rows.scalars().all())
@@ -0,0 +1,95 @@
+"""Loader that batches concurrent lookups by primary key."""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import ARRAY, any_, bindparam, select
+from sqlalchemy.inspection import inspect
+
+from app.db.sqlalchemy import AsyncSessionFactory, task_session
+
+LOADER_MAX_BATCH_SIZE = 1000
+
+PendingFutures = Dict[Any, List["asyncio.Future[Any]"]]
+
+
+class PrimaryKeyLoader:
+    """Load objects by primary key with one query per event loop iteration.
+
+    Lookups made by different tasks in the same iteration are merged into
+    `SELECT ... WHERE pkey = ANY(:pkey_vals)`. Queries run in their own sessions,
+    so only committed objects are loaded.
+    """
+
+    def __init__(
+        self,
+        session_factory: AsyncSessionFactory,
+        cls_model: Any,
+        max_batch_size: int = LOADER_MAX_BATCH_SIZE,
+    ) -> None:
+        self._session_factory = session_factory
+        self._cls_model = cls_model
+        self._max_batch_size = max_batch_size
+
+        primary_key = inspect(cls_model).primary_key[0]
+        # Query text doesn't depend on batch size, so it is prepared once
+        self._query = select(cls_model).where(
+            primary_key == any_(bindparam("pkey_vals", type_=ARRAY(primary_key.type)))
+        )
+
+        self._pending: PendingFutures = {}
+        # Keep references to running batches, so they aren't garbage collected
+        self._batch_tasks: Set["asyncio.Task[None]"] = set()
+
+    async def load(self, pkey_val: Any) -> Optional[Any]:
+        """Load object or return `None` if it doesn't exist."""
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._dispatch)
+
+        future = loop.create_future()
+        self._pending.setdefault(pkey_val, []).append(future)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        pending = self._pending
+        self._pending = {}
+
+        pkey_vals = list(pending)
+        for offset in range(0, len(pkey_vals), self._max_batch_size):
+            batch = {
+                pkey_val: pending[pkey_val]
+                for pkey_val in pkey_vals[offset : offset + self._max_batch_size]
+            }
+            batch_task = asyncio.create_task(self._load_batch(batch))
+            self._batch_tasks.add(batch_task)
+            batch_task.add_done_callback(self._batch_tasks.discard)
+
+    async def _load_batch(self, batch: PendingFutures) -> None:
+        try:
+            models = await self._fetch_models(list(batch))
+        except Exception as exc:
+            for failed_futures in batch.values():
+                set_futures_exception(failed_futures, exc)
+            return
+
+        for pkey_val, futures in batch.items():
+            set_futures_result(futures, models.get(pkey_val))
+
+    async def _fetch_models(self, pkey_vals: List[Any]) -> Dict[Any, Any]:
+        async with task_session(self._session_factory) as db_session:
+            rows = await db_session.scalars(self._query, {"pkey_vals": pkey_vals})
+            return {inspect(row).identity[0]: row for row in rows}
+
+
+def set_futures_result(futures: List["asyncio.Future[Any]"], model: Any) -> None:
+    for future in futures:
+        if not future.done():
+            future.set_result(model)
+
+
+def set_futures_exception(futures: List["asyncio.Future[Any]"], exc: Exception) -> None:
+    for future in futures:
+        if not future.done():
+            future.set_exception(exc)
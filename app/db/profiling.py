@@ -0,0 +1,67 @@
+"""Counting and timing of SQL queries."""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.logger import logger
+from app.settings import settings
+
+QUERY_STARTED_AT = "query_started_at"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_time: float = 0
+    # Statements have placeholders instead of values, so they are query shapes
+    statements: Dict[str, int] = field(default_factory=dict)
+
+
+# Stats of queries run by current incoming message, if they are collected
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def profile_queries(engine: AsyncEngine) -> None:
+    """Collect stats of queries and log slow queries of engine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", start_query_timer)
+    event.listen(
+        engine.sync_engine, "after_cursor_execute", stop_query_timer, named=True
+    )
+    event.listen(engine.sync_engine, "handle_error", drop_query_timer)
+
+
+def start_query_timer(connection: Any, *_: Any) -> None:
+    connection.info.setdefault(QUERY_STARTED_AT, []).append(time.perf_counter())
+
+
+def stop_query_timer(conn: Any, statement: str, **_: Any) -> None:
+    query_time = time.perf_counter() - conn.info[QUERY_STARTED_AT].pop()
+
+    slow_query_threshold = settings.SQL_SLOW_QUERY_THRESHOLD
+    if slow_query_threshold and query_time >= slow_query_threshold:
+        logger.warning(f"Slow query took {query_time:.3f}s: {statement}")
+
+    query_stats = query_stats_var.get()
+    if query_stats is not None:
+        add_query(query_stats, statement, query_time)
+
+
+def drop_query_timer(exception_context: ExceptionContext) -> None:
+    # Failed query isn't stopped, so its timer would be taken by next query
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(QUERY_STARTED_AT):
+        connection.info[QUERY_STARTED_AT].pop()
+
+
+def add_query(query_stats: QueryStats, statement: str, query_time: float) -> None:
+    query_stats.count += 1
+    query_stats.total_time += query_time
+    query_stats.statements[statement] = query_stats.statements.get(statement, 0) + 1
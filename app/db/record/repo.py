@@ -1,42 +1,78 @@
 """Record repo."""
 
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+from sqlalchemy.exc import NoResultFound
+
+from app.db.cache import RepoCache
 from app.db.crud import CRUD
+from app.db.loader import PrimaryKeyLoader
 from app.db.record.models import RecordModel
-from app.db.sqlalchemy import AsyncSession
+from app.db.sqlalchemy import USE_PRIMARY, AsyncSession, has_writes
 from app.schemas.record import Record
 
 
 class RecordRepo:
-    def __init__(self, session: AsyncSession):
-        """Initialize repo with CRUD."""
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: Optional[RepoCache] = None,
+        loader: Optional[PrimaryKeyLoader] = None,
+    ):
+        """Initialize repo with CRUD.
+
+        Records are read through `cache` by id, if it is passed. Lookups by id
+        are batched with other tasks by `loader`, if it is passed.
+        """
+        self._session = session
         self._crud = CRUD(session=session, cls_model=RecordModel)
+        self._cache = cache
+        self._loader = loader
 
     async def create(self, record_data: str) -> Record:
         """Create record row in db."""
-        row = await self._crud.create(model_data={"record_data": record_data})
-        record_in_db = await self._crud.get(pkey_val=row.id)
+        record_in_db = await self._crud.create(model_data={"record_data": record_data})
         return Record.from_orm(record_in_db)
 
+    async def create_many(self, records_data: List[str]) -> List[Record]:
+        """Create record rows in db."""
+        records_in_db = await self._crud.create_many(
+            models_data=[{"record_data": record_data} for record_data in records_data]
+        )
+        return [Record.from_orm(record) for record in records_in_db]
+
     async def update(self, record_id: int, record_data: str) -> Record:
         """Update record row in db."""
-        await self._crud.update(
+        record_in_db = await self._crud.update(
             pkey_val=record_id,
             model_data={"record_data": record_data},
         )
-        record_in_db = await self._crud.get(pkey_val=record_id)
+        self._invalidate_on_commit(record_id)
         return Record.from_orm(record_in_db)
 
     async def delete(self, record_id: int) -> None:
         await self._crud.delete(pkey_val=record_id)
+        self._invalidate_on_commit(record_id)
 
     async def get(self, record_id: int) -> Record:
-        record = await self._crud.get(pkey_val=record_id)
-        return Record.from_orm(record)
+        if self._cache is not None or self._loader is not None:
+            record = await self.get_or_none(record_id)
+            if record is None:
+                raise NoResultFound("No row was found when one was required")
+
+            return record
+
+        record_in_db = await self._crud.get(pkey_val=record_id)
+        return Record.from_orm(record_in_db)
 
     async def get_or_none(self, record_id: int) -> Optional[Record]:
-        record = await self._crud.get_or_none(pkey_val=record_id)
+        if self._cache is not None:
+            record_data = await self._cache.get_or_load(
+                self._session, record_id, lambda: self._load(record_id)
+            )
+            return Record.parse_obj(record_data) if record_data else None
+
+        record = await self._get_model(record_id)
         if record:
             return Record.from_orm(record)
 
@@ -47,6 +83,20 @@ class RecordRepo:
         records_in_db = await self._crud.all()
         return [Record.from_orm(record) for record in records_in_db]
 
+    async def iterate_all(self) -> AsyncIterator[Record]:
+        """Iterate over all objects without loading them at once."""
+        async for record in self._crud.iterate_all():
+            yield Record.from_orm(record)
+
+    async def get_page(
+        self, after_record_id: Optional[int] = None, page_size: int = 100
+    ) -> List[Record]:
+        """Get objects that follow `after_record_id`, ordered by id."""
+        records_in_db = await self._crud.get_page(
+            after_pkey_val=after_record_id, page_size=page_size
+        )
+        return [Record.from_orm(record) for record in records_in_db]
+
     async def filter_by_record_data(self, record_data: str) -> List[Record]:
         """Get all objects."""
         records_in_db = await self._crud.get_by_field(
@@ -54,3 +104,25 @@ class RecordRepo:
             field_value=record_data,
         )
         return [Record.from_orm(record) for record in records_in_db]
+
+    async def _load(self, record_id: int) -> Optional[Dict[str, Any]]:
+        record = await self._get_model(record_id)
+        if record:
+            return Record.from_orm(record).dict()
+
+        return None
+
+    async def _get_model(self, record_id: int) -> Optional[RecordModel]:
+        if self._loader is None or self._reads_own_writes():
+            return await self._crud.get_or_none(pkey_val=record_id)
+
+        return await self._loader.load(record_id)
+
+    def _reads_own_writes(self) -> bool:
+        # Loader doesn't see uncommitted writes of this session and may read
+        # replicas, which lag behind writes committed by this session
+        return has_writes(self._session) or bool(self._session.info.get(USE_PRIMARY))
+
+    def _invalidate_on_commit(self, record_id: int) -> None:
+        if self._cache is not None:
+            self._cache.invalidate_on_commit(self._session, record_id)
@@ -1,9 +1,14 @@
 """SQLAlchemy helpers."""
 
-from asyncio import current_task
-from typing import Callable
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from uuid import uuid4
 
-from sqlalchemy import MetaData
+from sqlalchemy import Engine, MetaData, Select, event, exc
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -11,13 +16,26 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+    SessionTransaction,
+    declarative_base,
+)
+from sqlalchemy.pool import ConnectionPoolEntry
 from sqlalchemy.pool.impl import AsyncAdaptedQueuePool
 
+from app.db.cache import invalidate_committed
+from app.db.profiling import profile_queries
+from app.logger import logger
 from app.settings import settings
 
 AsyncSessionFactory = Callable[..., AsyncSession]
 
+USE_PRIMARY = "use_primary"
+REPLICA_ENGINE = "replica_engine"
+HAS_WRITES = "has_writes"
+
 
 def make_url_async(url: str) -> str:
     """Add +asyncpg to url scheme."""
@@ -39,17 +57,257 @@ convention = {
 
 Base = declarative_base(metadata=MetaData(naming_convention=convention))
 
-engine: AsyncEngine = create_async_engine(
-    make_url_async(settings.POSTGRES_DSN), poolclass=AsyncAdaptedQueuePool
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    # Includes time of opening new connections
+    total_checkout_time: float = 0
+    max_checkout_time: float = 0
+
+    @property
+    def avg_checkout_time(self) -> float:
+        if not self.checkouts:
+            return 0
+
+        return self.total_checkout_time / self.checkouts
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Pool that measures time of waiting for connections."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "MeasuredQueuePool":
+        pool: MeasuredQueuePool = super().recreate()  # type: ignore
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            checkout_time = time.perf_counter() - started_at
+            self.stats.checkouts += 1
+            self.stats.total_checkout_time += checkout_time
+            self.stats.max_checkout_time = max(
+                self.stats.max_checkout_time, checkout_time
+            )
+
+
+def get_connect_args() -> Dict[str, Any]:
+    if not settings.DB_PGBOUNCER_MODE:
+        return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+    # PgBouncer in transaction mode may run statements of one client on different
+    # server connections, so prepared statements aren't cached and names are unique
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def build_engine(dsn: str) -> AsyncEngine:
+    db_engine = create_async_engine(
+        make_url_async(dsn),
+        poolclass=MeasuredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=get_connect_args(),
+    )
+    if settings.SQL_PROFILING:
+        profile_queries(db_engine)
+
+    return db_engine
+
+
+class ReplicaRouter:
+    """Round-robin over replicas that passed last health check."""
+
+    def __init__(self, engines: List[AsyncEngine], health_check_interval: float):
+        self.engines = engines
+        self.healthy = [True for _ in engines]
+        self._health_check_interval = health_check_interval
+        self._counter = itertools.count()
+        self._health_check_task: Optional["asyncio.Task[None]"] = None
+
+    def get_engine(self) -> Optional[AsyncEngine]:
+        healthy_engines = [
+            replica_engine
+            for replica_engine, is_healthy in zip(self.engines, self.healthy)
+            if is_healthy
+        ]
+        if not healthy_engines:
+            return None
+
+        return healthy_engines[next(self._counter) % len(healthy_engines)]
+
+    def start(self) -> None:
+        if self.engines:
+            self._health_check_task = asyncio.create_task(self._check_periodically())
+
+    async def stop(self) -> None:
+        if self._health_check_task:
+            self._health_check_task.cancel()
+            await asyncio.gather(self._health_check_task, return_exceptions=True)
+
+        for replica_engine in self.engines:
+            await replica_engine.dispose()
+
+    async def check_health(self) -> None:
+        for index, replica_engine in enumerate(self.engines):
+            await self._check_replica(index, replica_engine)
+
+    async def _check_replica(self, index: int, replica_engine: AsyncEngine) -> None:
+        try:
+            await asyncio.wait_for(
+                verify_db_connection(replica_engine),
+                timeout=self._health_check_interval,
+            )
+        except Exception:
+            if self.healthy[index]:
+                logger.exception(f"Replica #{index} is ejected")
+            self.healthy[index] = False
+            return
+
+        if not self.healthy[index]:
+            logger.info(f"Replica #{index} is healthy again")
+        self.healthy[index] = True
+
+    async def _check_periodically(self) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self._health_check_interval)
+            await self.check_health()
+
+
+engine: AsyncEngine = build_engine(settings.POSTGRES_DSN)
+replica_router = ReplicaRouter(
+    [build_engine(dsn) for dsn in settings.POSTGRES_REPLICA_DSNS],
+    health_check_interval=settings.DB_REPLICA_HEALTH_CHECK_INTERVAL,
 )
 
 
+class RoutingSession(Session):
+    """Session that sends reads to replicas and everything else to primary.
+
+    Session is pinned to primary after first write, so it reads its own writes.
+    Replica is chosen once per transaction, so its reads see one replica state.
+    """
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Engine:
+        is_routed = (
+            not self.info.get(USE_PRIMARY) and not self._flushing
+        )  # noqa: WPS437
+        if is_routed and is_read_clause(kwargs.get("clause")):
+            replica_engine = self.info.get(REPLICA_ENGINE)
+            if replica_engine is None:
+                replica_engine = replica_router.get_engine()
+                self.info[REPLICA_ENGINE] = replica_engine
+
+            if replica_engine is not None:
+                return replica_engine.sync_engine
+
+        self.info[USE_PRIMARY] = True
+        return engine.sync_engine
+
+
+def is_read_clause(clause: Any) -> bool:
+    if not isinstance(clause, Select):
+        return False
+
+    return clause._for_update_arg is None  # noqa: WPS437
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send all following queries of session to primary.
+
+    Used to read data just written by other sessions, because replicas lag.
+    """
+    session.info[USE_PRIMARY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def track_executed_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[HAS_WRITES] = True
+
+
+@event.listens_for(Session, "after_flush")
+def track_flushed_writes(session: Session, _: Any) -> None:
+    session.info[HAS_WRITES] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def reset_writes(session: Session) -> None:
+    session.info.pop(HAS_WRITES, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def release_replica(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(REPLICA_ENGINE, None)
+
+
+def has_writes(session: AsyncSession) -> bool:
+    """Check that session has uncommitted or unflushed changes."""
+    return bool(
+        session.info.get(HAS_WRITES) or session.new or session.dirty or session.deleted
+    )
+
+
+@asynccontextmanager
+async def task_session(
+    session_factory: AsyncSessionFactory,
+) -> AsyncIterator[AsyncSession]:
+    """Use session of current task and release it on exit.
+
+    Connection is checked out on first query only. Session is committed only if
+    something was written and is removed from factory registry, so finished tasks
+    don't keep their sessions. Cached objects written by committed transactions
+    are invalidated before exit.
+    """
+    async with scoped_session(session_factory) as db_session:
+        yield db_session
+
+        if has_writes(db_session):
+            await db_session.commit()
+
+
+@asynccontextmanager
+async def scoped_session(
+    session_factory: AsyncSessionFactory,
+) -> AsyncIterator[AsyncSession]:
+    db_session = session_factory()
+    try:
+        yield db_session
+    finally:
+        await invalidate_committed(db_session)
+        await session_factory.remove()  # type: ignore
+
+
 async def build_db_session_factory() -> AsyncSessionFactory:
     await verify_db_connection(engine)
+    replica_router.start()
 
     return async_scoped_session(
-        async_sessionmaker(bind=engine, expire_on_commit=False),
-        scopefunc=current_task,
+        async_sessionmaker(
+            bind=engine,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession if replica_router.engines else Session,
+        ),
+        scopefunc=asyncio.current_task,
     )
 
 
@@ -59,4 +317,5 @@ async def verify_db_connection(engine: AsyncEngine) -> None:
 
 
 async def close_db_connections() -> None:
+    await replica_router.stop()
     await engine.dispose()
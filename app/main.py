@@ -10,8 +10,14 @@ from redis import asyncio as aioredis
 from app.api.routers import router
 from app.bot.bot import get_bot
 from app.caching.callback_redis_repo import CallbackRedisRepo
+from app.caching.compression import Compression
 from app.caching.exception_handlers import PubsubExceptionHandler
+from app.caching.local_cache import LocalCache
 from app.caching.redis_repo import RedisRepo
+from app.caching.serializers import Serializer
+from app.db.cache import RepoCache
+from app.db.loader import PrimaryKeyLoader
+from app.db.record.models import RecordModel
 from app.db.sqlalchemy import build_db_session_factory, close_db_connections
 from app.resources import strings
 from app.settings import settings
@@ -28,19 +34,57 @@ async def startup(application: FastAPI, raise_bot_exceptions: bool) -> None:
         **redis_client.connection_pool.connection_kwargs,
     )
     redis_client.connection_pool = pool
-    redis_repo = RedisRepo(redis=redis_client, prefix=strings.BOT_PROJECT_NAME)
+    local_cache = None
+    if settings.REDIS_LOCAL_CACHE_SIZE:
+        local_cache = LocalCache(
+            max_size=settings.REDIS_LOCAL_CACHE_SIZE,
+            ttl=settings.REDIS_LOCAL_CACHE_TTL,
+        )
+    compression = None
+    if settings.REDIS_COMPRESSION:
+        compression = Compression(
+            settings.REDIS_COMPRESSION,
+            threshold=settings.REDIS_COMPRESSION_THRESHOLD,
+        )
+    redis_repo = RedisRepo(
+        redis=redis_client,
+        prefix=strings.BOT_PROJECT_NAME,
+        serializer=Serializer(
+            legacy_writes=settings.REDIS_LEGACY_PICKLE_WRITES,
+            compression=compression,
+        ),
+        local_cache=local_cache,
+        legacy_keys_read=settings.REDIS_LEGACY_KEYS_READ,
+    )
 
     # -- Bot --
-    callback_repo = CallbackRedisRepo(redis_client)
+    callback_repo = CallbackRedisRepo(
+        redis_client,
+        prefix=strings.BOT_PROJECT_NAME,
+        durable=settings.CALLBACK_DURABLE_DELIVERY,
+    )
+    await callback_repo.start()
+    await redis_repo.subscribe_invalidations(callback_repo.pubsub)
     process_callbacks_task = asyncio.create_task(
         callback_repo.pubsub.run(exception_handler=PubsubExceptionHandler())
     )
-    bot = get_bot(callback_repo, raise_exceptions=raise_bot_exceptions)
+    bot = get_bot(
+        callback_repo, raise_exceptions=raise_bot_exceptions, redis=redis_client
+    )
 
     await bot.startup()
 
     bot.state.db_session_factory = db_session_factory
     bot.state.redis_repo = redis_repo
+    bot.state.callback_repo = callback_repo
+    bot.state.records_cache = None
+    if settings.RECORDS_CACHE_EXPIRE:
+        bot.state.records_cache = RepoCache(
+            redis_repo, "records", expire=settings.RECORDS_CACHE_EXPIRE
+        )
+    bot.state.records_loader = None
+    if settings.RECORDS_LOADER_BATCHING:
+        bot.state.records_loader = PrimaryKeyLoader(db_session_factory, RecordModel)
 
     application.state.bot = bot
     application.state.redis = redis_client
@@ -0,0 +1,40 @@
+"""Waiting for callbacks of many BotX methods at once."""
+
+from contextlib import suppress
+from typing import Optional, Sequence
+from uuid import UUID
+
+from pybotx import Bot
+from pybotx.bot.exceptions import BotXMethodCallbackNotFoundError
+
+from app.caching.callback_redis_repo import CallbackRedisRepo, CallbacksWaitResult
+
+
+async def wait_botx_method_callbacks(
+    bot: Bot,
+    sync_ids: Sequence[UUID],
+    timeout: Optional[float] = None,
+) -> CallbacksWaitResult:
+    """Wait callbacks of methods sent with `wait_callback=False`.
+
+    All callbacks are waited under one deadline, so fan-out to many chats takes
+    one callback timeout. By default the latest timeout of sent methods is used.
+    """
+
+    callbacks_manager = bot._callbacks_manager  # noqa: WPS437
+
+    remaining_times = []
+    for sync_id in sync_ids:
+        # Method was sent with `wait_callback=True` or callback already expired
+        with suppress(BotXMethodCallbackNotFoundError):
+            remaining_times.append(
+                callbacks_manager.cancel_callback_timeout_alarm(
+                    sync_id, return_remaining_time=True
+                )
+            )
+
+    if timeout is None:
+        timeout = max(remaining_times, default=0)
+
+    callback_repo: CallbackRedisRepo = bot.state.callback_repo
+    return await callback_repo.wait_botx_method_callbacks(sync_ids, timeout)
@@ -1,6 +1,6 @@
 """Application settings."""
 
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
 
 from pybotx import BotAccountWithSecret
@@ -23,6 +23,8 @@ class AppSettings(BaseSettings):
                 ]
             elif field_name == "SMARTLOG_DEBUG_HUIDS":
                 return cls.parse_smartlog_debug_huids(raw_val)
+            elif field_name == "POSTGRES_REPLICA_DSNS":
+                return raw_val.replace(",", " ").split()
 
             return cls.json_loads(raw_val)  # type: ignore
 
@@ -62,11 +64,67 @@ class AppSettings(BaseSettings):
 
     # database
     POSTGRES_DSN: str
+    # Read queries are sent to replicas, if they are set
+    POSTGRES_REPLICA_DSNS: List[str] = []
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 5
     SQL_DEBUG: bool = False
+    # Count and time queries of each message, stats are added to smart logger
+    SQL_PROFILING: bool = False
+    # Limits to warn about, disabled when 0
+    SQL_SLOW_QUERY_THRESHOLD: float = 0
+    SQL_QUERY_BUDGET: int = 0
+    SQL_REPEATED_QUERY_LIMIT: int = 0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = False
+    # Seconds after which connections are reopened, never when -1
+    DB_POOL_RECYCLE: int = -1
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Don't use prepared statements, they break with PgBouncer transaction pooling
+    DB_PGBOUNCER_MODE: bool = False
+    # Seconds to cache records read by id, disabled when 0
+    RECORDS_CACHE_EXPIRE: int = 0
+    # Merge lookups of records by id made in one event loop iteration into one query
+    RECORDS_LOADER_BATCHING: bool = False
 
     # redis
     REDIS_DSN: str
     CONNECTION_POOL_SIZE: int = 10
+    # Keep writing untagged pickle payloads while older replicas are running
+    REDIS_LEGACY_PICKLE_WRITES: bool = False
+    # Read values stored with hashed keys by previous versions
+    REDIS_LEGACY_KEYS_READ: bool = False
+    # In-process cache in front of redis, disabled when size is 0
+    REDIS_LOCAL_CACHE_SIZE: int = 0
+    REDIS_LOCAL_CACHE_TTL: float = 5
+    # Compressor for large values: zlib, lz4 or zstd, disabled when not set
+    REDIS_COMPRESSION: Optional[str] = None
+    REDIS_COMPRESSION_THRESHOLD: int = 1024
+
+    # Commands executed by each process at once, not limited when 0
+    BOT_MAX_IN_FLIGHT_COMMANDS: int = 0
+    # Commands waiting for execution, others are rejected with 503
+    BOT_MAX_QUEUED_COMMANDS: int = 0
+    # Execute commands of one chat one by one in order of arrival
+    BOT_CHAT_ORDERING: bool = False
+    # Also don't execute commands of one chat on different instances at once
+    BOT_CHAT_LEASES: bool = False
+    BOT_CHAT_LEASE_TTL: float = 30
+
+    # callbacks
+    CALLBACK_DURABLE_DELIVERY: bool = False
+
+    # BotX requests per second to each CTS from all instances, disabled when 0
+    BOTX_RATE_LIMIT: float = 0
+    BOTX_RATE_LIMIT_BURST: int = 20
+    # Tokens taken from redis at once, so most requests don't wait for redis
+    BOTX_RATE_LIMIT_PREFETCH: int = 5
+
+    # Incoming messages per user and per chat in window, disabled when 0
+    FLOOD_USER_LIMIT: int = 0
+    FLOOD_CHAT_LIMIT: int = 0
+    FLOOD_WINDOW: int = 10
 
     # healthcheck
     WORKER_TIMEOUT_SEC: float = 4
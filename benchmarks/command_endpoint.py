@@ -0,0 +1,107 @@
+"""Compare CPU time of parsing and responding on `/command` with json and orjson.
+
+Run from project root: `python -m benchmarks.command_endpoint`.
+"""
+
+import json
+import timeit
+from http import HTTPStatus
+from typing import Any, Callable, List, Tuple
+from uuid import uuid4
+
+import orjson
+from fastapi.responses import JSONResponse
+from pybotx import build_command_accepted_response
+
+from app.api.endpoints.botx import build_accepted_response
+
+NUMBER = 10000
+
+COMMAND_PAYLOAD = {
+    "bot_id": str(uuid4()),
+    "command": {
+        "body": "/help",
+        "command_type": "user",
+        "data": {},
+        "metadata": {},
+    },
+    "attachments": [],
+    "async_files": [],
+    "entities": [],
+    "source_sync_id": None,
+    "sync_id": str(uuid4()),
+    "from": {
+        "ad_domain": "example.com",
+        "ad_login": "user",
+        "app_version": "2.10.0",
+        "chat_type": "chat",
+        "device": "Chrome",
+        "device_meta": {
+            "permissions": {"microphone": True, "notifications": True},
+            "pushes": True,
+            "timezone": "Europe/Moscow",
+        },
+        "device_software": "Linux",
+        "group_chat_id": str(uuid4()),
+        "host": "cts.example.com",
+        "is_admin": True,
+        "is_creator": True,
+        "locale": "ru",
+        "manufacturer": "Google",
+        "platform": "web",
+        "platform_package_id": "ru.unlimitedtech.express",
+        "user_huid": str(uuid4()),
+        "username": "Test User",
+    },
+    "proto_version": 4,
+}
+
+
+def measure(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 10**6
+
+
+def handle_with_json(body: bytes) -> None:
+    json.loads(body)
+    JSONResponse(build_command_accepted_response(), status_code=HTTPStatus.ACCEPTED)
+
+
+def handle_with_orjson(body: bytes) -> None:
+    orjson.loads(body)
+    build_accepted_response()
+
+
+def main() -> None:
+    body = json.dumps(COMMAND_PAYLOAD).encode()
+    accepted_response = build_command_accepted_response()
+    rows: List[Tuple[str, ...]] = [("step", "json, us", "orjson, us")]
+
+    rows.append(
+        (
+            "parse body",
+            f"{measure(lambda: json.loads(body)):.2f}",
+            f"{measure(lambda: orjson.loads(body)):.2f}",
+        )
+    )
+    rows.append(
+        (
+            "accepted response",
+            f"{measure(lambda: JSONResponse(accepted_response)):.2f}",
+            f"{measure(build_accepted_response):.2f}",
+        )
+    )
+    rows.append(
+        (
+            "total",
+            f"{measure(lambda: handle_with_json(body)):.2f}",
+            f"{measure(lambda: handle_with_orjson(body)):.2f}",
+        )
+    )
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare time of hashed and readable redis keys encoding.
+
+Run from project root: `python -m benchmarks.redis_keys`.
+"""
+
+import timeit
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+from uuid import uuid4
+
+from app.caching.keys import encode_key, hash_key
+
+NUMBER = 100000
+
+SAMPLES: Dict[str, Hashable] = {
+    "str": "user_settings",
+    "int": 1234567,
+    "uuid": uuid4(),
+    "tuple": (uuid4(), uuid4(), "state"),
+    "frozenset": frozenset(("a", "b")),
+}
+
+
+def measure(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 10**6
+
+
+def main() -> None:
+    rows: List[Tuple[str, ...]] = [("sample", "hashed, us", "encoded, us", "key")]
+
+    for name, sample in SAMPLES.items():
+        rows.append(
+            (
+                name,
+                f"{measure(lambda: hash_key(sample)):.2f}",
+                f"{measure(lambda: encode_key(sample)):.2f}",
+                encode_key(sample),
+            )
+        )
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()
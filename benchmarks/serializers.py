@@ -0,0 +1,80 @@
+"""Compare payload size and encode/decode time of redis serializers.
+
+Run from project root: `python -m benchmarks.serializers`.
+"""
+
+import pickle  # noqa: S403
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from pybotx.models.method_callbacks import (
+    BotAPIMethodFailedCallback,
+    BotAPIMethodSuccessfulCallback,
+)
+
+from app.caching.serializers import Serializer
+
+NUMBER = 10000
+
+SAMPLES: Dict[str, Any] = {
+    "successful callback": BotAPIMethodSuccessfulCallback(
+        sync_id=uuid4(), status="ok", result={}
+    ),
+    "failed callback": BotAPIMethodFailedCallback(
+        sync_id=uuid4(),
+        status="error",
+        reason="chat_not_found",
+        errors=["Chat not found"],
+        error_data={"group_chat_id": str(uuid4())},
+    ),
+    "fsm state": {"state": "waiting_for_email", "data": {"attempts": 2}},
+    "user search": [
+        {"huid": str(uuid4()), "username": f"User {index}", "emails": []}
+        for index in range(20)
+    ],
+    "uuid": uuid4(),
+}
+
+
+def measure(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 10**6
+
+
+def main() -> None:
+    serializer = Serializer()
+    rows: List[Tuple[str, ...]] = [
+        (
+            "sample",
+            "pickle, B",
+            "tagged, B",
+            "pickle dumps, us",
+            "tagged dumps, us",
+            "pickle loads, us",
+            "tagged loads, us",
+        ),
+    ]
+
+    for name, sample in SAMPLES.items():
+        pickle_dump = pickle.dumps(sample)
+        tagged_dump = serializer.dumps(sample)
+
+        rows.append(
+            (
+                name,
+                str(len(pickle_dump)),
+                str(len(tagged_dump)),
+                f"{measure(lambda: pickle.dumps(sample)):.2f}",
+                f"{measure(lambda: serializer.dumps(sample)):.2f}",
+                f"{measure(lambda: pickle.loads(pickle_dump)):.2f}",  # noqa: S301
+                f"{measure(lambda: serializer.loads(tagged_dump)):.2f}",
+            )
+        )
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()
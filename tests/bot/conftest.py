@@ -0,0 +1,11 @@
+from uuid import UUID
+
+import pytest
+from pybotx import BotAccountWithSecret
+
+
+@pytest.fixture
+def bot_account(bot_id: UUID, host: str, secret_key: str) -> BotAccountWithSecret:
+    return BotAccountWithSecret(
+        id=bot_id, cts_url=f"https://{host}", secret_key=secret_key
+    )
@@ -0,0 +1,72 @@
+import asyncio
+from dataclasses import replace
+from typing import Callable, List
+
+import pytest
+from pybotx import Bot, BotAccountWithSecret, HandlerCollector, IncomingMessage
+
+from app.bot.admission import AdmissionControlBot, AdmissionStats, BotOverloadedError
+
+
+async def test_commands_over_limits_are_rejected(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    release_commands = asyncio.Event()
+    executed_commands: List[str] = []
+
+    @collector.default_message_handler
+    async def default_handler(message: IncomingMessage, bot: Bot) -> None:
+        await release_commands.wait()
+        executed_commands.append(message.body)
+
+    bot = AdmissionControlBot(
+        collectors=[collector],
+        bot_accounts=[bot_account],
+        max_in_flight=1,
+        max_queued=1,
+    )
+
+    # - Act -
+    tasks = [
+        bot.async_execute_bot_command(incoming_message_factory(body="first")),
+        bot.async_execute_bot_command(incoming_message_factory(body="second")),
+    ]
+    with pytest.raises(BotOverloadedError):
+        bot.async_execute_bot_command(incoming_message_factory(body="third"))
+    stats_under_load = replace(bot.admission_stats)
+
+    release_commands.set()
+    await asyncio.gather(*tasks)
+
+    # - Assert -
+    assert stats_under_load == AdmissionStats(in_flight=1, queued=1, rejected=1)
+    assert bot.admission_stats == AdmissionStats(in_flight=0, queued=0, rejected=1)
+    assert executed_commands == ["first", "second"]
+
+
+async def test_slots_of_commands_cancelled_before_start_are_released(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    bot = AdmissionControlBot(
+        collectors=[HandlerCollector()],
+        bot_accounts=[bot_account],
+        max_in_flight=1,
+        max_queued=1,
+    )
+    tasks = [
+        bot.async_execute_bot_command(incoming_message_factory(body="first")),
+        bot.async_execute_bot_command(incoming_message_factory(body="second")),
+    ]
+
+    # - Act -
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # - Assert -
+    assert bot.admission_stats == AdmissionStats(in_flight=0, queued=0, rejected=0)
@@ -0,0 +1,208 @@
+import asyncio
+from dataclasses import replace
+from typing import Callable, List
+from uuid import UUID, uuid4
+
+from pybotx import (
+    Bot,
+    BotAccountWithSecret,
+    Chat,
+    ChatTypes,
+    HandlerCollector,
+    IncomingMessage,
+)
+from redis import asyncio as aioredis
+
+from app.bot.admission import AdmissionStats
+from app.bot.chat_ordering import ChatOrderedBot
+from app.caching.chat_leases import ChatLeases
+
+
+def build_chat_message(
+    incoming_message_factory: Callable[..., IncomingMessage], body: str, chat_id: UUID
+) -> IncomingMessage:
+    message = incoming_message_factory(body=body)
+    message.chat = Chat(id=chat_id, type=ChatTypes.GROUP_CHAT)
+    return message
+
+
+async def test_commands_of_chat_are_executed_in_order(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    executed_commands: List[str] = []
+
+    @collector.default_message_handler
+    async def default_handler(message: IncomingMessage, bot: Bot) -> None:
+        executed_commands.append(f"{message.body} started")
+        # Earlier commands take longer
+        await asyncio.sleep(0.1 / int(message.body[-1]))
+        executed_commands.append(f"{message.body} finished")
+
+    bot = ChatOrderedBot(
+        collectors=[collector],
+        bot_accounts=[bot_account],
+        chat_ordering=True,
+    )
+
+    messages = []
+    for body in ("first chat 1", "first chat 2", "second chat 3"):
+        message = incoming_message_factory(body=body)
+        message.chat = Chat(
+            id=UUID(int=1) if body.startswith("first") else uuid4(),
+            type=ChatTypes.GROUP_CHAT,
+        )
+        messages.append(message)
+
+    # - Act -
+    await asyncio.gather(
+        *(bot.async_execute_bot_command(message) for message in messages)
+    )
+
+    # - Assert -
+    assert executed_commands == [
+        "first chat 1 started",
+        "second chat 3 started",
+        "second chat 3 finished",
+        "first chat 1 finished",
+        "first chat 2 started",
+        "first chat 2 finished",
+    ]
+    assert bot.active_chats == 0
+
+
+async def test_commands_waiting_for_chat_turn_do_not_hold_slots(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    release_commands = asyncio.Event()
+    executed_commands: List[str] = []
+
+    @collector.default_message_handler
+    async def default_handler(message: IncomingMessage, bot: Bot) -> None:
+        if message.body.startswith("first"):
+            await release_commands.wait()
+        executed_commands.append(message.body)
+
+    bot = ChatOrderedBot(
+        collectors=[collector],
+        bot_accounts=[bot_account],
+        chat_ordering=True,
+        max_in_flight=2,
+        max_queued=1,
+    )
+    first_chat_id = uuid4()
+    messages = [
+        build_chat_message(incoming_message_factory, "first chat 1", first_chat_id),
+        build_chat_message(incoming_message_factory, "first chat 2", first_chat_id),
+        build_chat_message(incoming_message_factory, "second chat 3", uuid4()),
+    ]
+
+    # - Act -
+    tasks = [bot.async_execute_bot_command(message) for message in messages]
+    await tasks[2]
+    executed_under_load = executed_commands.copy()
+    stats_under_load = replace(bot.admission_stats)
+
+    release_commands.set()
+    await asyncio.gather(*tasks)
+
+    # - Assert -
+    assert executed_under_load == ["second chat 3"]
+    assert stats_under_load == AdmissionStats(in_flight=1, waiting=1)
+    assert executed_commands == ["second chat 3", "first chat 1", "first chat 2"]
+    assert bot.admission_stats == AdmissionStats(in_flight=0, queued=0, rejected=0)
+
+
+async def test_commands_waiting_for_chat_turn_are_not_limited_by_queue(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    release_commands = asyncio.Event()
+    executed_commands: List[str] = []
+
+    @collector.default_message_handler
+    async def default_handler(message: IncomingMessage, bot: Bot) -> None:
+        await release_commands.wait()
+        executed_commands.append(message.body)
+
+    bot = ChatOrderedBot(
+        collectors=[collector],
+        bot_accounts=[bot_account],
+        chat_ordering=True,
+        max_in_flight=2,
+        max_queued=0,
+    )
+    first_chat_id = uuid4()
+    messages = [
+        build_chat_message(incoming_message_factory, "first chat 1", first_chat_id),
+        build_chat_message(incoming_message_factory, "first chat 2", first_chat_id),
+        build_chat_message(incoming_message_factory, "first chat 3", first_chat_id),
+        build_chat_message(incoming_message_factory, "second chat 4", uuid4()),
+    ]
+
+    # - Act -
+    tasks = [bot.async_execute_bot_command(message) for message in messages]
+    await asyncio.sleep(0)
+    stats_under_load = replace(bot.admission_stats)
+
+    release_commands.set()
+    await asyncio.gather(*tasks)
+
+    # - Assert -
+    assert stats_under_load == AdmissionStats(in_flight=2, waiting=2)
+    assert executed_commands == [
+        "first chat 1",
+        "second chat 4",
+        "first chat 2",
+        "first chat 3",
+    ]
+    assert bot.admission_stats == AdmissionStats()
+
+
+async def test_commands_waiting_for_chat_lease_do_not_hold_slots(
+    bot_account: BotAccountWithSecret,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    executed_commands: List[str] = []
+
+    @collector.default_message_handler
+    async def default_handler(message: IncomingMessage, bot: Bot) -> None:
+        executed_commands.append(message.body)
+
+    chat_leases = ChatLeases(redis_client, prefix=uuid4().hex, retry_interval=0.01)
+    bot = ChatOrderedBot(
+        collectors=[collector],
+        bot_accounts=[bot_account],
+        chat_ordering=True,
+        chat_leases=chat_leases,
+        max_in_flight=1,
+        max_queued=0,
+    )
+    first_chat_id = uuid4()
+
+    # - Act -
+    # Chat is held by another instance
+    async with chat_leases.lease(first_chat_id):
+        first_task = bot.async_execute_bot_command(
+            build_chat_message(incoming_message_factory, "first chat", first_chat_id)
+        )
+        await asyncio.sleep(0.1)
+        await bot.async_execute_bot_command(
+            build_chat_message(incoming_message_factory, "second chat", uuid4())
+        )
+
+    await first_task
+
+    # - Assert -
+    assert executed_commands == ["second chat", "first chat"]
+    assert bot.admission_stats == AdmissionStats(in_flight=0, queued=0, rejected=0)
@@ -0,0 +1,110 @@
+from typing import Callable
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from pybotx import IncomingMessage
+from redis import asyncio as aioredis
+
+from app.bot.middlewares.flood_limit import FloodLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_flood_limit_drops_messages_over_user_limit(
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    flood_limit = FloodLimitMiddleware(user_limit=2, chat_limit=0, window=10)
+    bot = Mock()
+    call_next = AsyncMock()
+    # Messages of one user are sent to different chats
+    messages = [incoming_message_factory() for _ in range(3)]
+
+    # - Act -
+    for message in messages:
+        await flood_limit(message, bot, call_next)
+
+    # - Assert -
+    assert call_next.await_count == 2
+
+
+async def test_flood_limit_drops_messages_over_chat_limit(
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    flood_limit = FloodLimitMiddleware(user_limit=0, chat_limit=2, window=10)
+    bot = Mock()
+    call_next = AsyncMock()
+    chat_message = incoming_message_factory()
+    other_chat_message = incoming_message_factory()
+
+    # - Act -
+    for _ in range(3):
+        await flood_limit(chat_message, bot, call_next)
+    await flood_limit(other_chat_message, bot, call_next)
+
+    # - Assert -
+    assert call_next.await_count == 3
+    call_next.assert_awaited_with(other_chat_message, bot)
+
+
+async def test_flood_limit_resets_counters_in_next_window(
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    clock = FakeClock()
+    flood_limit = FloodLimitMiddleware(
+        user_limit=1, chat_limit=0, window=10, clock=clock
+    )
+    bot = Mock()
+    call_next = AsyncMock()
+    await flood_limit(incoming_message_factory(), bot, call_next)
+    await flood_limit(incoming_message_factory(), bot, call_next)
+
+    # - Act -
+    clock.now = 10
+    await flood_limit(incoming_message_factory(), bot, call_next)
+
+    # - Assert -
+    assert call_next.await_count == 2
+
+
+async def test_flood_limit_shares_counters_after_sync(
+    incoming_message_factory: Callable[..., IncomingMessage],
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    prefix = uuid4().hex
+    # Counters are synced explicitly, not in background
+    first_flood_limit, second_flood_limit = (
+        FloodLimitMiddleware(
+            user_limit=0,
+            chat_limit=3,
+            window=10,
+            redis=redis_client,
+            prefix=prefix,
+            sync_interval=10,
+            clock=FakeClock(),
+        )
+        for _ in range(2)
+    )
+    bot = Mock()
+    call_next = AsyncMock()
+    message = incoming_message_factory()
+    for _ in range(2):
+        await first_flood_limit(message, bot, call_next)
+        await second_flood_limit(message, bot, call_next)
+
+    # - Act -
+    await second_flood_limit._sync_counts()  # noqa: WPS437
+    await first_flood_limit._sync_counts()  # noqa: WPS437
+    await first_flood_limit(message, bot, call_next)
+
+    # - Assert -
+    assert call_next.await_count == 4
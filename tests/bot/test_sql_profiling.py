@@ -0,0 +1,92 @@
+from typing import AsyncGenerator, Callable
+from unittest.mock import Mock
+
+import pytest
+from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.bot.middlewares.sql_profiling import sql_profiling_middleware
+from app.db.profiling import profile_queries
+from app.db.sqlalchemy import build_engine
+from app.settings import settings
+
+
+@pytest.fixture
+async def profiled_engine() -> AsyncGenerator[AsyncEngine, None]:
+    db_engine = build_engine(settings.POSTGRES_DSN)
+    profile_queries(db_engine)
+    yield db_engine
+    await db_engine.dispose()
+
+
+def build_query_runner(
+    db_engine: AsyncEngine, query: str, repeats: int
+) -> IncomingMessageHandlerFunc:
+    async def run_queries(message: IncomingMessage, bot: Bot) -> None:
+        async with db_engine.connect() as connection:
+            for _ in range(repeats):
+                await connection.execute(text(query))
+
+    return run_queries
+
+
+async def test_sql_profiling_warns_about_repeated_queries(
+    profiled_engine: AsyncEngine,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    loguru_caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 5)
+    monkeypatch.setattr(settings, "SQL_REPEATED_QUERY_LIMIT", 2)
+    message = incoming_message_factory(body="/records list")
+    run_queries = build_query_runner(profiled_engine, "SELECT 1", repeats=3)
+
+    # - Act -
+    await sql_profiling_middleware(message, Mock(), run_queries)
+
+    # - Assert -
+    assert (
+        "Command `/records` repeated query 3 times, it may be N+1: SELECT 1"
+        in loguru_caplog.text
+    )
+    assert "budget" not in loguru_caplog.text
+
+
+async def test_sql_profiling_warns_about_query_budget(
+    profiled_engine: AsyncEngine,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    loguru_caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 2)
+    monkeypatch.setattr(settings, "SQL_REPEATED_QUERY_LIMIT", 5)
+    message = incoming_message_factory(body="/records")
+    run_queries = build_query_runner(profiled_engine, "SELECT 1", repeats=3)
+
+    # - Act -
+    await sql_profiling_middleware(message, Mock(), run_queries)
+
+    # - Assert -
+    assert "Command `/records` ran 3 queries, budget is 2" in loguru_caplog.text
+    assert "N+1" not in loguru_caplog.text
+
+
+async def test_sql_profiling_warns_about_slow_queries(
+    profiled_engine: AsyncEngine,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    loguru_caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_THRESHOLD", 0.05)
+    run_queries = build_query_runner(profiled_engine, "SELECT pg_sleep(0.1)", repeats=1)
+
+    # - Act -
+    await sql_profiling_middleware(incoming_message_factory(), Mock(), run_queries)
+
+    # - Assert -
+    assert "Slow query took" in loguru_caplog.text
+    assert "SELECT pg_sleep(0.1)" in loguru_caplog.text
@@ -0,0 +1,88 @@
+from typing import List
+from uuid import UUID
+
+import pytest
+from pybotx import (
+    Bot,
+    BotAccountWithSecret,
+    ChatTypes,
+    HandlerCollector,
+    IncomingMessage,
+    StatusRecipient,
+)
+
+from app.bot.status import CachedStatusBot
+
+
+@pytest.fixture
+def status_recipient(bot_id: UUID, user_huid: UUID) -> StatusRecipient:
+    return StatusRecipient(
+        bot_id=bot_id,
+        huid=user_huid,
+        ad_login=None,
+        ad_domain=None,
+        is_admin=False,
+        chat_type=ChatTypes.PERSONAL_CHAT,
+    )
+
+
+def build_collector(command_name: str) -> HandlerCollector:
+    collector = HandlerCollector()
+
+    @collector.command(command_name, description="Test command")
+    async def test_command(message: IncomingMessage, bot: Bot) -> None:
+        """Test command."""
+
+    return collector
+
+
+async def test_status_is_cached_until_invalidation(
+    bot_account: BotAccountWithSecret,
+    status_recipient: StatusRecipient,
+) -> None:
+    # - Arrange -
+    bot = CachedStatusBot(
+        collectors=[build_collector("/first")], bot_accounts=[bot_account]
+    )
+    first_menu = await bot.get_status(status_recipient)
+    first_help_text = await bot.get_help_text(status_recipient)
+    bot._handler_collector.include(build_collector("/second"))  # noqa: WPS437
+
+    # - Act -
+    cached_menu = await bot.get_status(status_recipient)
+    cached_help_text = await bot.get_help_text(status_recipient)
+    bot.invalidate_status_cache()
+    invalidated_menu = await bot.get_status(status_recipient)
+
+    # - Assert -
+    assert cached_menu is first_menu
+    assert cached_help_text == first_help_text == "`/first` -- Test command"
+    assert invalidated_menu == {"/first": "Test command", "/second": "Test command"}
+
+
+async def test_status_is_not_cached_with_visibility_function(
+    bot_account: BotAccountWithSecret,
+    status_recipient: StatusRecipient,
+) -> None:
+    # - Arrange -
+    collector = HandlerCollector()
+    visibility_checks: List[StatusRecipient] = []
+
+    async def is_visible(recipient: StatusRecipient, bot: Bot) -> bool:
+        visibility_checks.append(recipient)
+        return len(visibility_checks) > 1
+
+    @collector.command("/hidden", description="Test command", visible=is_visible)
+    async def hidden_command(message: IncomingMessage, bot: Bot) -> None:
+        """Test command."""
+
+    bot = CachedStatusBot(collectors=[collector], bot_accounts=[bot_account])
+
+    # - Act -
+    first_menu = await bot.get_status(status_recipient)
+    second_menu = await bot.get_status(status_recipient)
+
+    # - Assert -
+    assert not first_menu
+    assert second_menu == {"/hidden": "Test command"}
+    assert len(visibility_checks) == 2
@@ -0,0 +1,56 @@
+import asyncio
+from typing import List
+from uuid import uuid4
+
+from app.caching.cached import cached
+from app.caching.redis_repo import RedisRepo
+
+
+async def test_cached_calls_function_once_for_concurrent_calls(
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    calls: List[str] = []
+    # Values are kept in redis between tests
+    chat_name = uuid4().hex
+
+    @cached(ttl=60, repo_getter=lambda: redis_repo)
+    async def get_chat_settings(chat_name: str) -> dict:
+        calls.append(chat_name)
+        await asyncio.sleep(0.1)
+        return {"chat_name": chat_name}
+
+    # - Act -
+    chats_settings = await asyncio.gather(
+        *(get_chat_settings(chat_name) for _ in range(5))
+    )
+    cached_chat_settings = await get_chat_settings(chat_name)
+
+    # - Assert -
+    assert calls == [chat_name]
+    assert chats_settings == [{"chat_name": chat_name} for _ in range(5)]
+    assert cached_chat_settings == {"chat_name": chat_name}
+
+
+async def test_cached_returns_stale_value_while_refreshing(
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    calls: List[None] = []
+
+    @cached(ttl=1, stale_ttl=60, repo_getter=lambda: redis_repo)
+    async def get_counter() -> int:
+        calls.append(None)
+        return len(calls)
+
+    await get_counter()
+    await asyncio.sleep(1.1)
+
+    # - Act -
+    stale_counter = await get_counter()
+    await asyncio.sleep(0.1)
+    refreshed_counter = await get_counter()
+
+    # - Assert -
+    assert stale_counter == 1
+    assert refreshed_counter == 2
@@ -0,0 +1,200 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import uuid4
+
+import pytest
+from pybotx import Bot, CallbackNotReceivedError
+from pybotx.bot.exceptions import BotXMethodCallbackNotFoundError
+from pybotx.models.method_callbacks import BotAPIMethodSuccessfulCallback
+from redis import asyncio as aioredis
+
+from app.caching.callback_redis_repo import CallbackRedisRepo
+from app.resources import strings
+from app.services.botx_callbacks import wait_botx_method_callbacks
+
+
+@asynccontextmanager
+async def run_callback_repo(
+    callback_repo: CallbackRedisRepo,
+) -> AsyncIterator[CallbackRedisRepo]:
+    await callback_repo.start()
+    pubsub_task = asyncio.create_task(callback_repo.pubsub.run())
+    try:
+        yield callback_repo
+    finally:
+        await callback_repo.stop_callbacks_waiting()
+        pubsub_task.cancel()
+        await asyncio.gather(pubsub_task, return_exceptions=True)
+
+
+def build_callback() -> BotAPIMethodSuccessfulCallback:
+    return BotAPIMethodSuccessfulCallback(sync_id=uuid4(), status="ok", result={})
+
+
+async def test_callback_redis_repo_resolves_local_callback_without_redis(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    callback_repo: CallbackRedisRepo = bot.state.callback_repo
+    callback = build_callback()
+    await callback_repo.create_botx_method_callback(callback.sync_id)
+
+    # - Act -
+    await callback_repo.set_botx_method_callback_result(callback)
+    received_callback = await callback_repo.wait_botx_method_callback(
+        callback.sync_id, timeout=1
+    )
+
+    # - Assert -
+    assert received_callback == callback
+    assert callback_repo.stats.local_deliveries == 1
+    assert callback_repo.stats.remote_deliveries == 0
+    assert callback_repo.stats.local_hit_ratio == 1
+    assert callback_repo.stats.futures == 0
+
+
+async def test_callback_redis_repo_delivers_callback_to_waiting_instance(
+    bot: Bot,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    callback_repo: CallbackRedisRepo = bot.state.callback_repo
+    other_callback_repo = CallbackRedisRepo(
+        redis_client, prefix=strings.BOT_PROJECT_NAME
+    )
+    callback = build_callback()
+    await callback_repo.create_botx_method_callback(callback.sync_id)
+
+    # - Act -
+    await other_callback_repo.set_botx_method_callback_result(callback)
+    received_callback = await callback_repo.wait_botx_method_callback(
+        callback.sync_id, timeout=1
+    )
+
+    # - Assert -
+    assert received_callback == callback
+    assert other_callback_repo.stats.remote_deliveries == 1
+    assert callback_repo.stats.local_deliveries == 0
+
+
+async def test_callback_redis_repo_picks_up_stored_callback(
+    bot: Bot,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(
+        redis_client, prefix="test", durable=True, result_poll_interval=0.05
+    )
+    other_callback_repo = CallbackRedisRepo(redis_client, prefix="test", durable=True)
+    callback = build_callback()
+
+    # - Act -
+    # Callback came before the route was created, so it isn't published
+    await other_callback_repo.set_botx_method_callback_result(callback)
+    await callback_repo.create_botx_method_callback(callback.sync_id)
+    received_callback = await callback_repo.wait_botx_method_callback(
+        callback.sync_id, timeout=1
+    )
+
+    # - Assert -
+    assert received_callback == callback
+    assert not await redis_client.exists(f"test:callback_results:{callback.sync_id}")
+
+
+async def test_callback_redis_repo_sweeper_expires_abandoned_callbacks(
+    bot: Bot,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(
+        redis_client, prefix="test", route_expire=1, sweep_interval=0.1
+    )
+    sync_id = uuid4()
+
+    # - Act -
+    async with run_callback_repo(callback_repo):
+        await callback_repo.create_botx_method_callback(sync_id)
+        await asyncio.sleep(1.2)
+
+        with pytest.raises(BotXMethodCallbackNotFoundError):
+            await callback_repo.wait_botx_method_callback(sync_id, timeout=1)
+
+    # - Assert -
+    assert callback_repo.stats.expired_futures == 1
+    assert callback_repo.stats.futures == 0
+
+
+async def test_callback_redis_repo_expires_oldest_callback_when_full(
+    bot: Bot,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(redis_client, prefix="test", max_futures=1)
+    oldest_sync_id = uuid4()
+    await callback_repo.create_botx_method_callback(oldest_sync_id)
+    oldest_future = callback_repo._futures[oldest_sync_id]  # noqa: WPS437
+
+    # - Act -
+    await callback_repo.create_botx_method_callback(uuid4())
+
+    # - Assert -
+    assert isinstance(oldest_future.exception(), CallbackNotReceivedError)
+    assert callback_repo.stats.expired_futures == 1
+    assert callback_repo.stats.futures == 1
+
+
+async def test_callback_redis_repo_counts_late_and_duplicate_callbacks(
+    bot: Bot,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(redis_client, prefix="test", max_futures=1)
+    other_callback_repo = CallbackRedisRepo(redis_client, prefix="test")
+    late_callback = build_callback()
+    callback = build_callback()
+
+    # - Act -
+    async with run_callback_repo(callback_repo):
+        # Route of expired callback is left in redis until it expires
+        await callback_repo.create_botx_method_callback(late_callback.sync_id)
+        await callback_repo.create_botx_method_callback(callback.sync_id)
+
+        await other_callback_repo.set_botx_method_callback_result(late_callback)
+        await other_callback_repo.set_botx_method_callback_result(callback)
+        await other_callback_repo.set_botx_method_callback_result(callback)
+        await asyncio.sleep(0.1)
+
+        received_callback = await callback_repo.wait_botx_method_callback(
+            callback.sync_id, timeout=1
+        )
+
+    # - Assert -
+    assert received_callback == callback
+    assert callback_repo.stats.late_callbacks == 1
+    assert callback_repo.stats.duplicate_callbacks == 1
+
+
+async def test_wait_botx_method_callbacks_returns_partial_result(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    callback_repo: CallbackRedisRepo = bot.state.callback_repo
+    callback = build_callback()
+    not_received_sync_id = uuid4()
+    unknown_sync_id = uuid4()
+    await callback_repo.create_botx_method_callback(callback.sync_id)
+    await callback_repo.create_botx_method_callback(not_received_sync_id)
+    await callback_repo.set_botx_method_callback_result(callback)
+
+    # - Act -
+    wait_result = await wait_botx_method_callbacks(
+        bot,
+        [callback.sync_id, not_received_sync_id, unknown_sync_id],
+        timeout=0.1,
+    )
+
+    # - Assert -
+    assert wait_result.callbacks == {callback.sync_id: callback}
+    assert wait_result.not_received == [not_received_sync_id, unknown_sync_id]
+    assert callback_repo.stats.futures == 0
@@ -0,0 +1,49 @@
+from typing import Hashable
+from uuid import UUID
+
+import pytest
+
+from app.caching.keys import encode_key, hash_key
+
+TEST_UUID = UUID("86c4814b-feee-4ff0-b04d-4b3226318078")
+
+
+@pytest.mark.parametrize(
+    "arg,encoded_key",
+    [
+        ("test_key", "s:test_key"),
+        (42, "i:42"),
+        (TEST_UUID, f"u:{TEST_UUID}"),
+        (("chat", TEST_UUID, None), f"t:('chat', UUID('{TEST_UUID}'), None)"),
+    ],
+)
+def test_encode_key_is_readable(arg: Hashable, encoded_key: str) -> None:
+    # - Act -
+    key = encode_key(arg)
+
+    # - Assert -
+    assert key == encoded_key
+
+
+def test_encode_key_hashes_other_values() -> None:
+    # - Arrange -
+    nested_tuple = ((1,),)
+    args = [True, 1.5, frozenset((1, 2)), (True,), nested_tuple]
+
+    # - Act -
+    keys = [encode_key(arg) for arg in args]
+    hashed_keys = [hash_key(arg) for arg in args]
+
+    # - Assert -
+    assert keys == hashed_keys
+
+
+def test_encode_key_tuple_items_types_are_not_mixed() -> None:
+    # - Arrange -
+    encode_key((1,))
+
+    # - Act -
+    key = encode_key((True,))
+
+    # - Assert -
+    assert key != encode_key((1,))
@@ -0,0 +1,63 @@
+from app.caching.local_cache import MISSING, LocalCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    # - Arrange -
+    local_cache = LocalCache(max_size=2, ttl=10)
+    local_cache.set("first", 1)
+    local_cache.set("second", 2)
+
+    # - Act -
+    local_cache.get("first")
+    local_cache.set("third", 3)
+
+    # - Assert -
+    assert local_cache.get("first") == 1
+    assert local_cache.get("second") is MISSING
+    assert local_cache.get("third") == 3
+    assert local_cache.stats.evictions == 1
+    assert local_cache.stats.size == 2
+
+
+def test_local_cache_expires_values() -> None:
+    # - Arrange -
+    clock = FakeClock()
+    local_cache = LocalCache(max_size=10, ttl=10, clock=clock)
+    local_cache.set("short", None, ttl=1)
+    local_cache.set("long", None, ttl=100)
+
+    # - Act -
+    clock.now = 5
+    cached_values = [local_cache.get("short"), local_cache.get("long")]
+    # Values live no longer than default ttl
+    clock.now = 10
+    cached_values.append(local_cache.get("long"))
+
+    # - Assert -
+    assert cached_values == [MISSING, None, MISSING]
+    assert local_cache.stats.expirations == 2
+    assert local_cache.stats.hits == 1
+    assert local_cache.stats.misses == 2
+
+
+def test_local_cache_delete_bumps_version() -> None:
+    # - Arrange -
+    local_cache = LocalCache(max_size=10, ttl=10)
+    local_cache.set("test_key", "test_value")
+    cache_version = local_cache.version
+
+    # - Act -
+    local_cache.delete("test_key")
+
+    # - Assert -
+    assert local_cache.get("test_key") is MISSING
+    assert local_cache.version != cache_version
+    assert local_cache.stats.invalidations == 1
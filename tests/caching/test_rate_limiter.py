@@ -0,0 +1,44 @@
+import time
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+
+from app.caching.rate_limiter import RateLimiter
+
+
+async def test_rate_limiter_serves_prefetched_tokens_without_redis(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    prefix = uuid4().hex
+    rate_limiter = RateLimiter(
+        redis_client, rate=1, capacity=5, prefetch=5, prefix=prefix
+    )
+    bucket_key = f"{prefix}:rate_limits:botx"
+    await rate_limiter.acquire("botx")
+    prefetched_bucket = await redis_client.hgetall(bucket_key)  # type: ignore
+
+    # - Act -
+    for _ in range(4):
+        await rate_limiter.acquire("botx")
+    bucket = await redis_client.hgetall(bucket_key)  # type: ignore
+
+    # - Assert -
+    assert bucket[b"updated_at"] == prefetched_bucket[b"updated_at"]
+    assert float(bucket[b"tokens"]) < 1
+
+
+async def test_rate_limiter_waits_when_bucket_is_empty(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter(redis_client, rate=10, capacity=1, prefix=uuid4().hex)
+    await rate_limiter.acquire("botx")
+    started_at = time.monotonic()
+
+    # - Act -
+    await rate_limiter.acquire("botx")
+    waited_ms = (time.monotonic() - started_at) * 1000
+
+    # - Assert -
+    assert waited_ms >= 80
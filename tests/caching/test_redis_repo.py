@@ -0,0 +1,170 @@
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+
+from app.caching.keys import hash_key
+from app.caching.local_cache import LocalCache
+from app.caching.redis_repo import RedisRepo
+
+
+async def store_legacy_value(
+    redis_client: aioredis.Redis, redis_repo: RedisRepo, prefix: str, key: str
+) -> str:
+    key_hash = hash_key(key)
+    legacy_key = f"{prefix}_{key_hash}"
+    await redis_client.set(legacy_key, redis_repo.serializer.dumps(f"{key}_value"))
+    return legacy_key
+
+
+async def test_redis_repo_local_cache_returns_independent_values(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis_client, prefix="test", local_cache=LocalCache(max_size=10, ttl=10)
+    )
+    await redis_repo.set("test_key", {"emails": []})
+    await redis_repo.get("test_key")
+
+    # - Act -
+    first_value = await redis_repo.get("test_key")
+    first_value["emails"].append("user@example.com")
+    second_value = await redis_repo.get("test_key")
+
+    # - Assert -
+    assert second_value == {"emails": []}
+    assert redis_repo.local_cache.stats.hits == 2  # type: ignore
+
+
+async def test_redis_repo_deletes_only_equal_value(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis_client, prefix="test")
+    await redis_repo.set("test_lock", "owner_token", expire=10)
+
+    # - Act -
+    is_deleted_by_other = await redis_repo.delete_if_equal("test_lock", "other_token")
+    is_deleted_by_owner = await redis_repo.delete_if_equal("test_lock", "owner_token")
+
+    # - Assert -
+    assert not is_deleted_by_other
+    assert is_deleted_by_owner
+    assert await redis_repo.get("test_lock") is None
+
+
+async def test_redis_repo_get_many_keeps_keys_order(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis_client, prefix=uuid4().hex)
+    await redis_repo.set_many({"first_key": 1, "third_key": 3})
+
+    # - Act -
+    storage_values = await redis_repo.get_many(
+        ["third_key", "second_key", "first_key"], default=0
+    )
+
+    # - Assert -
+    assert storage_values == [3, 0, 1]
+
+
+async def test_redis_repo_get_many_reads_only_local_cache_misses(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis_client, prefix=uuid4().hex, local_cache=LocalCache(max_size=10, ttl=10)
+    )
+    await redis_repo.set_many({"cached_key": "cached", "missed_key": "missed"})
+    await redis_repo.get("cached_key")
+
+    # - Act -
+    storage_values = await redis_repo.get_many(
+        ["missed_key", "cached_key", "absent_key"]
+    )
+
+    # - Assert -
+    assert storage_values == ["missed", "cached", None]
+    assert redis_repo.local_cache.stats.hits == 1  # type: ignore
+    assert await redis_repo.get("missed_key") == "missed"
+    assert redis_repo.local_cache.stats.hits == 2  # type: ignore
+
+
+async def test_redis_repo_rget_deletes_value(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis_client, prefix=uuid4().hex)
+    await redis_repo.set("test_key", "test_value")
+
+    # - Act -
+    first_value = await redis_repo.rget("test_key")
+    second_value = await redis_repo.rget("test_key", default="default")
+
+    # - Assert -
+    assert first_value == "test_value"
+    assert second_value == "default"
+    assert await redis_repo.get("test_key") is None
+
+
+async def test_redis_repo_sets_only_absent_value(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis_client, prefix=uuid4().hex)
+
+    # - Act -
+    is_set_first = await redis_repo.set_if_absent("test_key", "first_value")
+    is_set_second = await redis_repo.set_if_absent("test_key", "second_value")
+
+    # - Assert -
+    assert is_set_first
+    assert not is_set_second
+    assert await redis_repo.get("test_key") == "first_value"
+
+
+async def test_redis_repo_reads_legacy_keys(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    prefix = uuid4().hex
+    redis_repo = RedisRepo(redis_client, prefix=prefix, legacy_keys_read=True)
+    await store_legacy_value(redis_client, redis_repo, prefix, "first_key")
+    await store_legacy_value(redis_client, redis_repo, prefix, "second_key")
+    await redis_repo.set("second_key", "new_value")
+    await store_legacy_value(redis_client, redis_repo, prefix, "rget_key")
+
+    # - Act -
+    storage_value = await redis_repo.get("first_key")
+    storage_values = await redis_repo.get_many(["second_key", "first_key"])
+    rget_value = await redis_repo.rget("rget_key")
+
+    # - Assert -
+    assert storage_value == "first_key_value"
+    assert storage_values == ["new_value", "first_key_value"]
+    assert rget_value == "rget_key_value"
+    assert await redis_repo.get("rget_key") is None
+
+
+async def test_redis_repo_removes_legacy_keys_on_writes(
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    prefix = uuid4().hex
+    redis_repo = RedisRepo(redis_client, prefix=prefix, legacy_keys_read=True)
+    set_legacy_key = await store_legacy_value(
+        redis_client, redis_repo, prefix, "set_key"
+    )
+    deleted_legacy_key = await store_legacy_value(
+        redis_client, redis_repo, prefix, "deleted_key"
+    )
+
+    # - Act -
+    await redis_repo.set("set_key", "new_value")
+    await redis_repo.delete("deleted_key")
+
+    # - Assert -
+    assert not await redis_client.exists(set_legacy_key, deleted_legacy_key)
+    assert await redis_repo.get("set_key") == "new_value"
+    assert await redis_repo.get("deleted_key") is None
@@ -0,0 +1,93 @@
+import pickle  # noqa: S403
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx.models.method_callbacks import (
+    BotAPIMethodFailedCallback,
+    BotAPIMethodSuccessfulCallback,
+)
+
+from app.caching.compression import ZLIB_HEADER, Compression
+from app.caching.serializers import Serializer
+
+
+@pytest.mark.parametrize(
+    "storage_value",
+    [
+        {"state": "waiting_for_email", "data": {"attempts": 2}},
+        UUID("86c4814b-feee-4ff0-b04d-4b3226318078"),
+        {"not", "json"},
+        2**70,
+        BotAPIMethodSuccessfulCallback(sync_id=uuid4(), status="ok", result={}),
+        BotAPIMethodFailedCallback(
+            sync_id=uuid4(),
+            status="error",
+            reason="chat_not_found",
+            errors=["Chat not found"],
+            error_data={"group_chat_id": str(uuid4())},
+        ),
+    ],
+)
+def test_serializer_round_trip(storage_value: Any) -> None:
+    # - Arrange -
+    serializer = Serializer()
+
+    # - Act -
+    restored_value = serializer.loads(serializer.dumps(storage_value))
+
+    # - Assert -
+    assert restored_value == storage_value
+    assert isinstance(restored_value, type(storage_value))
+
+
+def test_serializer_reads_legacy_pickle() -> None:
+    # - Arrange -
+    serializer = Serializer()
+    legacy_dump = pickle.dumps({"test_key": "test_value"})
+
+    # - Act -
+    storage_value = serializer.loads(legacy_dump)
+
+    # - Assert -
+    assert storage_value == {"test_key": "test_value"}
+
+
+def test_serializer_pickles_plain_values_without_tag() -> None:
+    # - Arrange -
+    serializer = Serializer()
+
+    # - Act -
+    dump = serializer.dumps({"test_key": "test_value"})
+
+    # - Assert -
+    assert pickle.loads(dump) == {"test_key": "test_value"}  # noqa: S301
+
+
+def test_serializer_legacy_writes() -> None:
+    # - Arrange -
+    serializer = Serializer(legacy_writes=True)
+
+    # - Act -
+    dump = serializer.dumps({"test_key": "test_value"})
+
+    # - Assert -
+    assert pickle.loads(dump) == {"test_key": "test_value"}  # noqa: S301
+
+
+def test_serializer_compresses_large_payloads() -> None:
+    # - Arrange -
+    serializer = Serializer(compression=Compression(threshold=100))
+    small_value = {"state": "waiting_for_email"}
+    large_value = {"users": [{"username": "User", "emails": []} for _ in range(100)]}
+
+    # - Act -
+    small_dump = serializer.dumps(small_value)
+    large_dump = serializer.dumps(large_value)
+
+    # - Assert -
+    assert small_dump[0] != ZLIB_HEADER
+    assert large_dump[0] == ZLIB_HEADER
+    assert Serializer().loads(small_dump) == small_value
+    assert Serializer().loads(large_dump) == large_value
+    assert serializer.compression.stats.ratio > 1  # type: ignore
@@ -20,6 +20,7 @@ from pybotx import (
     UserSender,
 )
 from pybotx.logger import logger
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.caching.redis_repo import RedisRepo
@@ -53,6 +54,13 @@ async def redis_repo(bot: Bot) -> RedisRepo:
     return bot.state.redis_repo
 
 
+@pytest.fixture
+async def redis_client() -> AsyncGenerator[aioredis.Redis, None]:
+    client = aioredis.from_url(settings.REDIS_DSN)
+    yield client
+    await client.close()
+
+
 def mock_authorization() -> None:
     respx.route(method="GET", path__regex="/api/v2/botx/bots/.*/token").mock(
         return_value=httpx.Response(
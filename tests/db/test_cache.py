@@ -0,0 +1,85 @@
+from uuid import uuid4
+
+from pybotx import Bot
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.caching.redis_repo import RedisRepo
+from app.db.cache import RepoCache, invalidate_committed
+from app.db.record.repo import RecordRepo
+from app.db.sqlalchemy import AsyncSessionFactory, task_session
+from app.schemas.record import Record
+
+
+async def get_record(
+    session_factory: AsyncSessionFactory, records_cache: RepoCache, record_id: int
+) -> Record:
+    async with task_session(session_factory) as db_session:
+        return await RecordRepo(db_session, cache=records_cache).get(record_id)
+
+
+async def test_cached_record_is_invalidated_after_commit(
+    db_session: AsyncSession,
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    record_repo = RecordRepo(db_session, cache=RepoCache(redis_repo, uuid4().hex))
+    record = await record_repo.create(record_data="test")
+    await db_session.commit()
+    await record_repo.get(record_id=record.id)
+
+    # - Act -
+    await record_repo.update(record_id=record.id, record_data="test (updated)")
+    await db_session.commit()
+    await invalidate_committed(db_session)
+
+    # - Assert -
+    assert await record_repo.get(record_id=record.id) == Record(
+        id=record.id, record_data="test (updated)"
+    )
+
+
+async def test_task_session_invalidates_cache_before_exit(
+    bot: Bot,
+    db_session: AsyncSession,
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    session_factory = bot.state.db_session_factory
+    records_cache = RepoCache(redis_repo, uuid4().hex)
+    record = await RecordRepo(db_session).create(record_data="test")
+    await db_session.commit()
+    await get_record(session_factory, records_cache, record.id)
+
+    # - Act -
+    async with task_session(session_factory) as task_db_session:
+        await RecordRepo(task_db_session, cache=records_cache).update(
+            record_id=record.id, record_data="test (updated)"
+        )
+
+    # - Assert -
+    assert await get_record(session_factory, records_cache, record.id) == Record(
+        id=record.id, record_data="test (updated)"
+    )
+
+
+async def test_stale_read_does_not_populate_cache(
+    db_session: AsyncSession,
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    # Ids of records are reused by tests, so cached entries are kept apart
+    records_cache = RepoCache(redis_repo, uuid4().hex)
+    record_repo = RecordRepo(db_session, cache=records_cache)
+    record = await record_repo.create(record_data="test")
+    await db_session.commit()
+
+    async def load_stale_record() -> dict:
+        # Write commits while record is loaded
+        await records_cache.invalidate([record.id])
+        return {"id": record.id, "record_data": "stale"}
+
+    # - Act -
+    await records_cache.get_or_load(db_session, record.id, load_stale_record)
+
+    # - Assert -
+    assert await record_repo.get(record_id=record.id) == record
@@ -0,0 +1,133 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.crud import CRUD
+from app.db.record.models import RecordModel
+
+
+async def test_crud_create_and_update_return_rows(db_session: AsyncSession) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    created_record = await crud.create(model_data={"record_data": "test"})
+
+    # - Act -
+    updated_record = await crud.update(
+        pkey_val=created_record.id, model_data={"record_data": "test (updated)"}
+    )
+
+    # - Assert -
+    assert created_record.id == 1
+    assert updated_record.id == 1
+    assert updated_record.record_data == "test (updated)"
+
+
+async def test_crud_create_many_keeps_order(db_session: AsyncSession) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    records_data = [f"test {index}" for index in range(5)]
+
+    # - Act -
+    created_records = await crud.create_many(
+        models_data=[{"record_data": record_data} for record_data in records_data]
+    )
+
+    # - Assert -
+    assert [(record.id, record.record_data) for record in created_records] == [
+        (1, "test 0"),
+        (2, "test 1"),
+        (3, "test 2"),
+        (4, "test 3"),
+        (5, "test 4"),
+    ]
+
+
+async def test_crud_upsert_many_creates_and_updates_rows(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    await crud.create(model_data={"record_data": "test"})
+
+    # - Act -
+    upserted_records = await crud.upsert_many(
+        models_data=[
+            {"id": 2, "record_data": "test 2"},
+            {"id": 1, "record_data": "test (updated)"},
+        ]
+    )
+
+    # - Assert -
+    assert [(record.id, record.record_data) for record in upserted_records] == [
+        (2, "test 2"),
+        (1, "test (updated)"),
+    ]
+
+
+async def test_crud_upsert_with_conflict_fields_only(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    await crud.create(model_data={"record_data": "test"})
+
+    # - Act -
+    upserted_record = await crud.upsert(model_data={"id": 1})
+
+    # - Assert -
+    assert upserted_record.id == 1
+    assert upserted_record.record_data == "test"
+
+
+async def test_crud_iterate_all_streams_every_row(db_session: AsyncSession) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    await crud.create_many(
+        models_data=[{"record_data": f"test {index}"} for index in range(5)]
+    )
+
+    # - Act -
+    record_ids = [record.id async for record in crud.iterate_all(batch_size=2)]
+
+    # - Assert -
+    assert sorted(record_ids) == [1, 2, 3, 4, 5]
+
+
+async def test_crud_iterate_by_field_streams_matching_rows(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    records_data = ["test 0", "test 1", "test 0", "test 1", "test 0"]
+    await crud.create_many(
+        models_data=[{"record_data": record_data} for record_data in records_data]
+    )
+
+    # - Act -
+    record_ids = [
+        record.id
+        async for record in crud.iterate_by_field(
+            field="record_data", field_value="test 0", batch_size=2
+        )
+    ]
+
+    # - Assert -
+    assert sorted(record_ids) == [1, 3, 5]
+
+
+async def test_crud_get_page_follows_primary_key(db_session: AsyncSession) -> None:
+    # - Arrange -
+    crud = CRUD(session=db_session, cls_model=RecordModel)
+    await crud.create_many(
+        models_data=[{"record_data": f"test {index}"} for index in range(5)]
+    )
+
+    # - Act -
+    first_page = await crud.get_page(page_size=2)
+    second_page = await crud.get_page(after_pkey_val=first_page[-1].id, page_size=2)
+    last_page = await crud.get_page(after_pkey_val=second_page[-1].id, page_size=2)
+    empty_page = await crud.get_page(after_pkey_val=last_page[-1].id, page_size=2)
+
+    # - Assert -
+    assert [record.id for record in first_page] == [1, 2]
+    assert [record.id for record in second_page] == [3, 4]
+    assert [record.id for record in last_page] == [5]
+    assert not empty_page
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Generator, List
+from unittest.mock import Mock
+
+import pytest
+from pybotx import Bot
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.loader import PrimaryKeyLoader
+from app.db.record.models import RecordModel
+from app.db.record.repo import RecordRepo
+from app.db.sqlalchemy import engine, use_primary
+
+
+@pytest.fixture
+def statements() -> Generator[List[str], None, None]:
+    executed_statements: List[str] = []
+
+    def track_statement(**kwargs: Any) -> None:
+        executed_statements.append(kwargs["statement"])
+
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", track_statement, named=True
+    )
+    yield executed_statements
+    event.remove(engine.sync_engine, "before_cursor_execute", track_statement)
+
+
+async def test_loader_batches_concurrent_lookups(
+    bot: Bot,
+    db_session: AsyncSession,
+    statements: List[str],
+) -> None:
+    # - Arrange -
+    records = await RecordRepo(db_session).create_many(["test 1", "test 2"])
+    await db_session.commit()
+    loader = PrimaryKeyLoader(bot.state.db_session_factory, RecordModel)
+    record_repo = RecordRepo(db_session, loader=loader)
+    statements.clear()
+
+    # - Act -
+    loaded_records = await asyncio.gather(
+        record_repo.get(record_id=records[0].id),
+        record_repo.get(record_id=records[1].id),
+        record_repo.get_or_none(record_id=records[0].id),
+        record_repo.get_or_none(record_id=records[1].id + 1),
+    )
+
+    # - Assert -
+    assert loaded_records == [
+        records[0],
+        records[1],
+        records[0],
+        None,
+    ]
+    assert len(statements) == 1
+
+
+async def test_repo_skips_loader_after_session_is_pinned_to_primary(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    record = await RecordRepo(db_session).create(record_data="test")
+    await db_session.commit()
+    loader = Mock(spec=PrimaryKeyLoader)
+    record_repo = RecordRepo(db_session, loader=loader)
+    use_primary(db_session)
+
+    # - Act -
+    loaded_record = await record_repo.get(record_id=record.id)
+
+    # - Assert -
+    assert loaded_record == record
+    loader.load.assert_not_called()
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.db.profiling import (
+    QUERY_STARTED_AT,
+    QueryStats,
+    profile_queries,
+    query_stats_var,
+)
+from app.db.sqlalchemy import build_engine
+from app.settings import settings
+
+
+async def test_failed_query_timer_is_dropped() -> None:
+    # - Arrange -
+    db_engine = build_engine(settings.POSTGRES_DSN)
+    profile_queries(db_engine)
+    query_stats = QueryStats()
+    token = query_stats_var.set(query_stats)
+
+    # - Act -
+    async with db_engine.connect() as connection:
+        with pytest.raises(DBAPIError):
+            await connection.execute(text("SELECT 1 / 0"))
+        await connection.rollback()
+        await connection.execute(text("SELECT 1"))
+        started_at = connection.info[QUERY_STARTED_AT]
+
+    query_stats_var.reset(token)
+    await db_engine.dispose()
+
+    # - Assert -
+    assert not started_at
+    assert query_stats.statements == {"SELECT 1": 1}
@@ -0,0 +1,149 @@
+from typing import AsyncGenerator, Generator, List, Union
+
+import pytest
+from pybotx import Bot
+from sqlalchemy import Connection, Engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import sqlalchemy
+from app.db.record.repo import RecordRepo
+from app.settings import settings
+
+
+@pytest.fixture
+async def replica_router(
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[sqlalchemy.ReplicaRouter, None]:
+    # Primary is used as both replicas, only routing is checked
+    router = sqlalchemy.ReplicaRouter(
+        [
+            sqlalchemy.build_engine(settings.POSTGRES_DSN),
+            sqlalchemy.build_engine(settings.POSTGRES_DSN),
+        ],
+        health_check_interval=1,
+    )
+    monkeypatch.setattr(sqlalchemy, "replica_router", router)
+    yield router
+    await router.stop()
+
+
+def get_read_bind(db_session: AsyncSession) -> Union[Engine, Connection]:
+    return db_session.sync_session.get_bind(clause=select(1))
+
+
+async def test_routing_session_keeps_replica_until_commit(
+    replica_router: sqlalchemy.ReplicaRouter,
+) -> None:
+    # - Arrange -
+    db_session = AsyncSession(
+        bind=sqlalchemy.engine, sync_session_class=sqlalchemy.RoutingSession
+    )
+
+    # - Act -
+    await db_session.execute(select(1))
+    first_bind = get_read_bind(db_session)
+    await db_session.execute(select(1))
+    second_bind = get_read_bind(db_session)
+    await db_session.commit()
+    await db_session.execute(select(1))
+    bind_after_commit = get_read_bind(db_session)
+    await db_session.close()
+
+    # - Assert -
+    assert first_bind is second_bind
+    assert bind_after_commit is not first_bind
+    assert {first_bind, bind_after_commit} == {
+        replica_engine.sync_engine for replica_engine in replica_router.engines
+    }
+
+
+@pytest.fixture
+def commits() -> Generator[List[Connection], None, None]:
+    committed_connections: List[Connection] = []
+
+    def track_commit(connection: Connection) -> None:
+        committed_connections.append(connection)
+
+    event.listen(sqlalchemy.engine.sync_engine, "commit", track_commit)
+    yield committed_connections
+    event.remove(sqlalchemy.engine.sync_engine, "commit", track_commit)
+
+
+async def test_task_session_skips_commit_of_read_only_session(
+    bot: Bot,
+    commits: List[Connection],
+) -> None:
+    # - Arrange -
+    session_factory = bot.state.db_session_factory
+
+    # - Act -
+    async with sqlalchemy.task_session(session_factory) as db_session:
+        record = await RecordRepo(db_session).get_or_none(record_id=1)
+
+    # - Assert -
+    assert record is None
+    assert not commits
+    assert not session_factory.registry.has()
+
+
+async def test_task_session_commits_writes(
+    bot: Bot,
+    commits: List[Connection],
+) -> None:
+    # - Arrange -
+    session_factory = bot.state.db_session_factory
+
+    # - Act -
+    async with sqlalchemy.task_session(session_factory) as db_session:
+        record = await RecordRepo(db_session).create(record_data="test")
+
+    # - Assert -
+    assert len(commits) == 1
+    assert not session_factory.registry.has()
+    async with sqlalchemy.task_session(session_factory) as other_session:
+        assert await RecordRepo(other_session).get(record_id=record.id) == record
+
+
+async def test_measured_pool_counts_checkouts() -> None:
+    # - Arrange -
+    db_engine = sqlalchemy.build_engine(settings.POSTGRES_DSN)
+    pool: sqlalchemy.MeasuredQueuePool = db_engine.pool  # type: ignore
+
+    # - Act -
+    async with db_engine.connect() as connection:
+        await connection.execute(select(1))
+        checked_out = pool.checkedout()
+    await db_engine.dispose()
+
+    # - Assert -
+    assert checked_out == 1
+    assert pool.stats.checkouts == 1
+    assert pool.stats.timeouts == 0
+    assert pool.stats.max_checkout_time > 0
+    assert pool.stats.avg_checkout_time == pool.stats.max_checkout_time
+
+
+def test_connect_args_disable_statement_cache_in_pgbouncer_mode(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", value=True)
+
+    # - Act -
+    connect_args = sqlalchemy.get_connect_args()
+
+    # - Assert -
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_connect_args_cache_statements_without_pgbouncer() -> None:
+    # - Act -
+    connect_args = sqlalchemy.get_connect_args()
+
+    # - Assert -
+    assert connect_args == {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+    }
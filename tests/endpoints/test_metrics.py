@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+import respx
+from fastapi.testclient import TestClient
+from pybotx import Bot
+
+from app.main import get_application
+from app.settings import settings
+
+
+@respx.mock
+def test__web_app__metrics_response_ok(
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "REDIS_LOCAL_CACHE_SIZE", 10)
+    monkeypatch.setattr(settings, "REDIS_COMPRESSION", "zlib")
+
+    # - Act -
+    with TestClient(get_application()) as test_client:
+        response = test_client.get("/metrics")
+
+    # - Assert -
+    assert response.status_code == HTTPStatus.OK
+    metrics_data = response.json()
+    assert set(metrics_data) == {
+        "callbacks",
+        "local_cache",
+        "compression",
+        "commands",
+        "db_pool",
+    }
+    assert set(metrics_data["commands"]) == {
+        "in_flight",
+        "queued",
+        "waiting",
+        "rejected",
+        "active_chats",
+    }
+    assert set(metrics_data["db_pool"]) == {
+        "size",
+        "checked_in",
+        "checked_out",
+        "overflow",
+        "checkouts",
+        "timeouts",
+        "total_checkout_time",
+        "max_checkout_time",
+        "avg_checkout_time",
+    }